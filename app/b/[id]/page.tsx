@@ -4,7 +4,7 @@ import { Clock, MapPin, Phone, Mail } from "lucide-react";
 import { ShareButtons } from "@/components/share-buttons";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
-import { createClient } from "@supabase/supabase-js";
+import { api } from "@/lib/api";
 import {
   formatDate,
   getHolidayStatus,
@@ -12,33 +12,14 @@ import {
 } from "@/lib/utils-holidays";
 
 async function getBusinessData(id: string) {
-  // Initialize the client inside the async function
-  const supabase = createClient(
-    process.env.NEXT_PUBLIC_SUPABASE_URL!,
-    process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!
-  );
-
-  const { data: business, error: businessError } = await supabase
-    .from("businesses")
-    .select("*")
-    .eq("id", id)
-    .maybeSingle();
-
-  if (businessError || !business) {
-    return null;
-  }
-
-  const { data: page, error: pageError } = await supabase
-    .from("pages")
-    .select("*")
-    .eq("business_id", id)
-    .maybeSingle();
-
-  if (pageError || !page) {
+  // One request fetches the business and its page and records the view. generateMetadata
+  // and the page make the same GET, which Next.js memoizes per render, so the
+  // view is recorded once.
+  try {
+    return await api.pages.getPublic(id, true);
+  } catch {
     return null;
   }
-
-  return { business, page };
 }
 
 export async function generateMetadata({
@@ -10,6 +10,7 @@ import { Step2HolidaySelection } from '@/components/wizard/step2-holiday-selecti
 import { Step3HoursConfig } from '@/components/wizard/step3-hours-config';
 import { Step4PreviewPayment } from '@/components/wizard/step4-preview-payment';
 import { api, Holiday } from '@/lib/api';
+import { PRESET_HOLIDAY_TEMPLATE_ID } from '@/lib/constants';
 import { Clock, ArrowRight } from 'lucide-react';
 import Link from 'next/link';
 
@@ -82,6 +83,7 @@ export default function CreatePage() {
         business_id: business.id,
         holidays: formData.holidays,
         regular_hours: {},
+        template_id: PRESET_HOLIDAY_TEMPLATE_ID,
       });
 
       await api.analytics.incrementView(page.id, 'direct');
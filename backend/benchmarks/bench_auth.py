@@ -0,0 +1,33 @@
+"""Magic-link token verify throughput with and without the verified-token cache.
+
+Run from backend/:  python -m benchmarks.bench_auth [verifies] [distinct_tokens]
+"""
+import sys
+import time
+
+from services.auth import AuthService
+
+
+def bench(label: str, service: AuthService, tokens: list, count: int):
+    start = time.perf_counter()
+    for i in range(count):
+        service.verify_magic_link_token(tokens[i % len(tokens)])
+    elapsed = time.perf_counter() - start
+    print(f"{label:<12} {count / elapsed:12.0f} verifies/s  {elapsed / count * 1e6:8.2f} us/verify")
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    distinct = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    uncached = AuthService()
+    uncached.cache_size = 0
+    cached = AuthService()
+
+    tokens = [
+        uncached.generate_magic_link_token(f"owner{i}@example.com", f"business-{i}")
+        for i in range(distinct)
+    ]
+
+    bench("no cache", uncached, tokens, count)
+    bench("cache", cached, tokens, count)
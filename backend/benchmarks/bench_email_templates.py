@@ -0,0 +1,56 @@
+"""Render cost per email for bulk sends.
+
+Run from backend/:  python -m benchmarks.bench_email_templates [count]
+"""
+import sys
+import time
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+from services import email_templates
+
+
+def bench(label: str, count: int, fn):
+    start = time.perf_counter()
+    for i in range(count):
+        fn(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed / count * 1e6:8.2f} us/email  ({count} emails, {elapsed:.3f}s)")
+
+
+def render_magic_link(i: int):
+    return email_templates.render(
+        'magic_link',
+        business_name=f"Business {i}",
+        magic_link=f"https://holidyhours.com/dashboard/{i}?token=abc{i}"
+    )
+
+
+def render_receipt(i: int):
+    return email_templates.render(
+        'payment_receipt',
+        business_name=f"Business {i}",
+        amount=140.0,
+        reference=f"ref_{i}",
+        page_url=f"https://holidyhours.com/b/{i}",
+        date=datetime.now().strftime('%B %d, %Y')
+    )
+
+
+def build_mime(i: int):
+    rendered = render_magic_link(i)
+    msg = MIMEMultipart('alternative')
+    msg['From'] = "noreply@holidyhours.com"
+    msg['To'] = f"owner{i}@example.com"
+    msg['Subject'] = rendered.subject
+    msg.attach(MIMEText(rendered.text, 'plain'))
+    msg.attach(MIMEText(rendered.html, 'html'))
+    return msg.as_bytes()
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    bench("render magic_link", count, render_magic_link)
+    bench("render payment_receipt", count, render_receipt)
+    bench("render + MIME serialize", count, build_mime)
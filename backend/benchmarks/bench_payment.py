@@ -0,0 +1,69 @@
+"""p50/p99 latency of POST /api/payment/initialize against a mock Paystack.
+
+Needs DATABASE_URL (and the other required settings) pointing at a database
+with the schema applied. Run from backend/:
+
+    python -m benchmarks.bench_payment [requests] [concurrency]
+"""
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks import mock_paystack
+from models import Business
+from database import AsyncSessionLocal
+from services.payment import payment_service
+import main
+
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+async def run(total: int, concurrency: int):
+    server = mock_paystack.serve_in_thread()
+    payment_service.base_url = "http://127.0.0.1:8765"
+
+    async with AsyncSessionLocal() as db:
+        business = Business(name="Bench Business", email="bench@example.com", payment_status='pending')
+        db.add(business)
+        await db.commit()
+        business_id = str(business.id)
+
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            async def one():
+                async with semaphore:
+                    start = time.perf_counter()
+                    response = await client.post(
+                        "/api/payment/initialize",
+                        json={"business_id": business_id, "email": "bench@example.com"}
+                    )
+                    latencies.append(time.perf_counter() - start)
+                    response.raise_for_status()
+
+            started = time.perf_counter()
+            await asyncio.gather(*[one() for _ in range(total)])
+            elapsed = time.perf_counter() - started
+
+    server.should_exit = True
+
+    print(f"requests={total} concurrency={concurrency} throughput={total / elapsed:.1f} req/s")
+    print(f"p50={percentile(latencies, 50) * 1000:.2f}ms "
+          f"p99={percentile(latencies, 99) * 1000:.2f}ms "
+          f"mean={statistics.mean(latencies) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(run(total, concurrency))
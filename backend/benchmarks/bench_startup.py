@@ -0,0 +1,111 @@
+"""Cold-start cost: importing main, building the app and answering a first request.
+
+Each run is a fresh interpreter, so nothing is cached in sys.modules. The child
+drives the ASGI app directly (lifespan startup, then one GET) instead of using
+an HTTP client, so the client's own import time is not counted.
+
+Needs DATABASE_URL (and the other required settings), since lifespan startup
+requeues pending payment events. Run from backend/:
+
+    python -m benchmarks.bench_startup [runs] [path]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+# Trees without the factory build the app at import time
+app = main.create_app() if hasattr(main, "create_app") else main.app
+created = time.perf_counter()
+
+
+async def first_request():
+    startup = asyncio.Queue()
+    shutdown_done = asyncio.Event()
+    sent = []
+
+    async def lifespan_receive():
+        return await startup.get()
+
+    async def lifespan_send(message):
+        sent.append(message["type"])
+        if message["type"] == "lifespan.shutdown.complete":
+            shutdown_done.set()
+
+    await startup.put({"type": "lifespan.startup"})
+    lifespan = asyncio.create_task(app({"type": "lifespan", "asgi": {"version": "3.0"}}, lifespan_receive, lifespan_send))
+    while "lifespan.startup.complete" not in sent:
+        await asyncio.sleep(0)
+    ready = time.perf_counter()
+
+    status = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": sys.argv[1], "raw_path": sys.argv[1].encode(), "root_path": "",
+        "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    await app(scope, receive, send)
+    responded = time.perf_counter()
+
+    await startup.put({"type": "lifespan.shutdown"})
+    await shutdown_done.wait()
+    await lifespan
+    return ready, responded, status[0]
+
+
+ready, responded, status = asyncio.run(first_request())
+print(json.dumps({
+    "import": imported - started,
+    "create_app": created - imported,
+    "startup": ready - created,
+    "first_request": responded - ready,
+    "to_first_response": responded - started,
+    "status": status,
+}))
+"""
+
+PHASES = ("import", "create_app", "startup", "first_request", "to_first_response", "process")
+
+
+def run_once(path: str) -> dict:
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD, path],
+        capture_output=True, text=True, cwd=os.getcwd()
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise SystemExit(result.stderr)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    # Interpreter start-up and shutdown included
+    timings["process"] = elapsed
+    return timings
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    path = sys.argv[2] if len(sys.argv) > 2 else "/health"
+
+    # The first run compiles .pyc files, so it is not counted
+    run_once(path)
+    samples = [run_once(path) for _ in range(runs)]
+    print(f"{runs} runs, GET {path} -> {samples[0]['status']}")
+    print(f"{'phase':<20}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for phase in PHASES:
+        values = [sample[phase] * 1000 for sample in samples]
+        print(f"{phase:<20}{statistics.median(values):>12.1f}{min(values):>10.1f}{max(values):>10.1f}")
@@ -0,0 +1,295 @@
+"""Mixed-workload load test for the API, with Paystack and SMTP mocked out.
+
+Drives main.app in-process through httpx.ASGITransport with a weighted mix of
+page reads, view increments, page edits, magic-link requests and payment
+verifies, then reports throughput and p50/p95/p99 per endpoint.
+
+Needs DATABASE_URL (and the other required settings) pointing at a database
+with the schema applied. Run from backend/:
+
+    python -m benchmarks.load_test --requests 5000 --concurrency 32
+    python -m benchmarks.load_test --save-baseline benchmarks/baseline.json
+    python -m benchmarks.load_test --compare benchmarks/baseline.json
+
+--compare exits with status 1 when a hot path (get_page, increment_view) has a
+p95 more than --tolerance slower than the baseline, or overall throughput
+drops by more than --tolerance. Baselines are only comparable when recorded
+on the same machine with the same options.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks import mock_paystack
+from services.auth import auth_service
+from services.email import email_service
+from services.payment import payment_service
+import main
+
+HOT_PATHS = ("get_page", "increment_view")
+
+DEFAULT_MIX = {
+    "get_page": 50,
+    "increment_view": 25,
+    "update_page": 10,
+    "verify_payment": 10,
+    "magic_link": 5,
+}
+
+
+class MockSMTPTransport:
+    # Stands in for SMTPTransport in the email workers
+    name = "smtp"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.sent = 0
+
+    def send(self, message):
+        time.sleep(self.latency)
+        self.sent += 1
+
+    def close(self):
+        pass
+
+
+def summarize(samples: list) -> dict:
+    if len(samples) < 2:
+        cuts = [samples[0]] * 99 if samples else [0.0] * 99
+    else:
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "mean_ms": round(statistics.mean(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+class Workload:
+    def __init__(self, client: httpx.AsyncClient, pages: int, references: int, rng: random.Random):
+        self.client = client
+        self.page_count = pages
+        self.reference_count = references
+        self.rng = rng
+        self.pages = []
+        self.references = []
+
+    async def setup(self):
+        for i in range(self.page_count):
+            email = f"load{i}@example.com"
+            response = await self.client.post("/api/businesses", json={"name": f"Load Test {i}", "email": email})
+            response.raise_for_status()
+            business_id = response.json()["id"]
+            response = await self.client.post("/api/pages", json={
+                "business_id": business_id,
+                "holidays": [
+                    {"name": "New Year's Day", "date": "2026-01-01", "status": "closed"},
+                    {"name": "Christmas Day", "date": "2026-12-25", "status": "closed"},
+                ],
+                "regular_hours": {"monday": {"open": "09:00", "close": "17:00"}},
+            })
+            response.raise_for_status()
+            token = auth_service.generate_magic_link_token(email, business_id)
+            self.pages.append((business_id, email, token))
+
+        for _ in range(self.reference_count):
+            business_id, email, _ = self.rng.choice(self.pages)
+            response = await self.client.post(
+                "/api/payment/initialize",
+                json={"business_id": business_id, "email": email}
+            )
+            response.raise_for_status()
+            self.references.append(response.json()["reference"])
+
+    def get_page(self):
+        business_id, _, _ = self.rng.choice(self.pages)
+        return self.client.get(f"/api/pages/{business_id}")
+
+    def increment_view(self):
+        business_id, _, _ = self.rng.choice(self.pages)
+        return self.client.post(f"/api/analytics/{business_id}/view", json={"source": "load-test"})
+
+    def update_page(self):
+        business_id, _, token = self.rng.choice(self.pages)
+        return self.client.patch(
+            f"/api/pages/{business_id}/holidays",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"upsert": [{
+                "name": "Store Anniversary",
+                "date": "2026-06-01",
+                "status": self.rng.choice(["closed", "normal"]),
+            }]}
+        )
+
+    def verify_payment(self):
+        return self.client.get(f"/api/payment/verify/{self.rng.choice(self.references)}")
+
+    def magic_link(self):
+        business_id, email, _ = self.rng.choice(self.pages)
+        return self.client.post("/api/auth/magic-link", json={"email": email, "business_id": business_id})
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    mix = dict(DEFAULT_MIX)
+
+    # Paystack runs in-process; SMTP sends only sleep
+    mock_paystack.app.state.latency = args.paystack_latency
+    payment_service.transport = httpx.ASGITransport(app=mock_paystack.app)
+    payment_service.base_url = "http://paystack.mock"
+    smtp = MockSMTPTransport(args.smtp_latency)
+    if hasattr(email_service, "queue"):
+        email_service.queue.transport_factory = lambda: smtp
+
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async with main.app.router.lifespan_context(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test") as client:
+            workload = Workload(client, args.pages, args.references, rng)
+            await workload.setup()
+
+            names = list(mix)
+            plan = rng.choices(names, weights=[mix[name] for name in names], k=args.requests)
+
+            async def one(name: str):
+                async with semaphore:
+                    start = time.perf_counter()
+                    try:
+                        response = await getattr(workload, name)()
+                        if response.status_code >= 400:
+                            errors[name] += 1
+                    except Exception:
+                        errors[name] += 1
+                    latencies[name].append(time.perf_counter() - start)
+
+            # Warm caches and pools so the first requests do not skew percentiles
+            await asyncio.gather(*[one(name) for name in plan[:args.warmup]])
+            latencies.clear()
+            errors.clear()
+
+            started = time.perf_counter()
+            await asyncio.gather(*[one(name) for name in plan[args.warmup:]])
+            elapsed = time.perf_counter() - started
+
+    measured = args.requests - args.warmup
+    return {
+        "options": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "pages": args.pages,
+            "references": args.references,
+            "seed": args.seed,
+            "paystack_latency": args.paystack_latency,
+            "smtp_latency": args.smtp_latency,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "throughput_rps": round(measured / elapsed, 1),
+        "elapsed_seconds": round(elapsed, 3),
+        "endpoints": {
+            name: {
+                "requests": len(samples),
+                "errors": errors[name],
+                **summarize(samples),
+            }
+            for name, samples in sorted(latencies.items())
+        },
+    }
+
+
+def print_report(result: dict):
+    print(f"throughput={result['throughput_rps']} req/s elapsed={result['elapsed_seconds']}s "
+          f"concurrency={result['options']['concurrency']}")
+    print(f"{'endpoint':<16}{'requests':>10}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in result["endpoints"].items():
+        print(f"{name:<16}{stats['requests']:>10}{stats['errors']:>8}"
+              f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+
+def compare(result: dict, baseline: dict, tolerance: float) -> list:
+    regressions = []
+    if result["options"] != baseline["options"]:
+        print("warning: options differ from the baseline, comparison may be meaningless")
+
+    floor = baseline["throughput_rps"] * (1 - tolerance)
+    if result["throughput_rps"] < floor:
+        regressions.append(
+            f"throughput {result['throughput_rps']} req/s < {floor:.1f} "
+            f"(baseline {baseline['throughput_rps']})"
+        )
+
+    for name in HOT_PATHS:
+        current = result["endpoints"].get(name)
+        previous = baseline["endpoints"].get(name)
+        if not current or not previous:
+            continue
+        ceiling = previous["p95_ms"] * (1 + tolerance)
+        if current["p95_ms"] > ceiling:
+            regressions.append(
+                f"{name} p95 {current['p95_ms']}ms > {ceiling:.2f}ms (baseline {previous['p95_ms']}ms)"
+            )
+        if current["errors"] > previous["errors"]:
+            regressions.append(f"{name} errors {current['errors']} > baseline {previous['errors']}")
+    return regressions
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pages", type=int, default=50, help="businesses/pages created for the run")
+    parser.add_argument("--references", type=int, default=20, help="payment references to verify")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--paystack-latency", type=float, default=0.05, help="seconds per mock Paystack call")
+    parser.add_argument("--smtp-latency", type=float, default=0.02, help="seconds per mock SMTP send")
+    parser.add_argument("--output", help="write the result JSON here")
+    parser.add_argument("--save-baseline", metavar="PATH", help="write the result as the new baseline")
+    parser.add_argument("--compare", metavar="PATH", help="baseline to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown, as a fraction")
+    args = parser.parse_args(argv)
+    args.warmup = min(args.warmup, args.requests - 1)
+    return args
+
+
+def main_cli(argv=None) -> int:
+    args = parse_args(argv)
+    result = asyncio.run(run(args))
+    print_report(result)
+
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, "w") as f:
+            json.dump(result, f, indent=2)
+            f.write("\n")
+        print(f"wrote {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(result, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,87 @@
+"""A local stand-in for the Paystack transaction API.
+
+Serve it with uvicorn (see serve_in_thread) and point PaymentService at it via
+base_url, or mount it in-process with httpx.ASGITransport.
+"""
+import asyncio
+import threading
+import time
+import uuid
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+
+# Simulated upstream processing time, in seconds
+app.state.latency = 0.0
+# reference -> transaction, filled by /transaction/initialize
+app.state.transactions = {}
+# Faults for the next verify calls, used in order: an HTTP status code to answer
+# with, or "timeout" to hang for hang_seconds before answering
+app.state.faults = []
+app.state.hang_seconds = 30.0
+# Verify calls per client connection, keyed by (host, port)
+app.state.verify_calls = Counter()
+
+
+def reset():
+    app.state.latency = 0.0
+    app.state.transactions = {}
+    app.state.faults = []
+    app.state.verify_calls = Counter()
+
+
+@app.post("/transaction/initialize")
+async def initialize(request: Request):
+    body = await request.json()
+    await asyncio.sleep(app.state.latency)
+    reference = uuid.uuid4().hex
+    app.state.transactions[reference] = body
+    return {
+        "status": True,
+        "message": "Authorization URL created",
+        "data": {
+            "authorization_url": f"https://checkout.paystack.com/{reference}",
+            "access_code": reference[:12],
+            "reference": reference,
+        },
+    }
+
+
+@app.get("/transaction/verify/{reference}")
+async def verify(reference: str, request: Request):
+    app.state.verify_calls[(request.client.host, request.client.port)] += 1
+    await asyncio.sleep(app.state.latency)
+    if app.state.faults:
+        fault = app.state.faults.pop(0)
+        if fault == "timeout":
+            await asyncio.sleep(app.state.hang_seconds)
+        else:
+            return JSONResponse({"status": False, "message": "Upstream error"}, status_code=fault)
+    transaction = app.state.transactions.get(reference, {})
+    return {
+        "status": True,
+        "message": "Verification successful",
+        "data": {
+            "status": "success",
+            "reference": reference,
+            "amount": transaction.get("amount", 1400000),
+            "metadata": transaction.get("metadata", {}),
+            "customer": {
+                "email": transaction.get("email", "owner@example.com"),
+                "customer_code": "CUS_mock",
+            },
+        },
+    }
+
+
+def serve_in_thread(host: str = "127.0.0.1", port: int = 8765) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
@@ -1,18 +1,126 @@
-from sqlalchemy import create_engine
+import time
+from uuid import uuid4
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config import settings
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+from config import Lazy, resolve, settings
+
+
+class PoolStats:
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def observe(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        if seconds > self.wait_seconds_max:
+            self.wait_seconds_max = seconds
+
+
+# Times how long each checkout waits for a connection (including connecting
+# a new one when the pool is below capacity)
+class _TimedPoolMixin:
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.observe(time.perf_counter() - start)
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    stats = PoolStats()
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    stats = PoolStats()
+
 
+def async_database_url(database_url: str):
+    url = make_url(database_url).set(drivername="postgresql+asyncpg")
+    # asyncpg takes `ssl` rather than libpq's `sslmode`
+    if "sslmode" in url.query:
+        sslmode = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": sslmode})
+    return url
 
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(poolclass) -> dict:
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def async_engine_options() -> dict:
+    options = engine_options(TimedAsyncAdaptedQueuePool)
+    if settings.db_pgbouncer_transaction_mode:
+        # PgBouncer may hand each transaction a different server connection, so
+        # asyncpg must not cache prepared statements or reuse their names
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return options
+
+
+engine = Lazy(
+    lambda: create_engine(settings.database_url, **engine_options(TimedQueuePool)),
+    close=lambda built: built.dispose()
+)
+SessionLocal = Lazy(lambda: sessionmaker(autocommit=False, autoflush=False, bind=resolve(engine)))
+
+async_engine = Lazy(
+    lambda: create_async_engine(async_database_url(settings.database_url), **async_engine_options()),
+    close=lambda built: built.dispose()
+)
+AsyncSessionLocal = Lazy(lambda: async_sessionmaker(
+    bind=resolve(async_engine),
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+))
+
 Base = declarative_base()
 
 
+def pool_status(pool) -> dict:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checkouts": pool.stats.checkouts,
+        "timeouts": pool.stats.timeouts,
+        "wait_seconds_total": round(pool.stats.wait_seconds_total, 6),
+        "wait_seconds_max": round(pool.stats.wait_seconds_max, 6),
+    }
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,78 @@
+import hmac
+from typing import Optional
+from uuid import UUID
+
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from config import settings
+from schemas import AuthPrincipal
+from services.auth import auth_service
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+def get_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)
+) -> AuthPrincipal:
+    # FastAPI caches dependencies per request, so the token is verified once however
+    # many routes or dependencies ask for the principal
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Missing bearer token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    try:
+        payload = auth_service.verify_magic_link_token(credentials.credentials)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+    return AuthPrincipal(
+        business_id=payload['business_id'],
+        email=payload['email'],
+        exp=payload['exp']
+    )
+
+
+def _check_owner(principal: AuthPrincipal, business_id: UUID) -> AuthPrincipal:
+    if principal.business_id != business_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token does not grant access to this business"
+        )
+    return principal
+
+
+def require_business_owner(
+    business_id: UUID,
+    principal: AuthPrincipal = Depends(get_principal)
+) -> AuthPrincipal:
+    return _check_owner(principal, business_id)
+
+
+def require_page_owner(
+    page_id: UUID,
+    principal: AuthPrincipal = Depends(get_principal)
+) -> AuthPrincipal:
+    # A page shares its business's id (see create_page), so ownership is checked
+    # without a database lookup
+    return _check_owner(principal, page_id)
+
+
+def require_admin(x_admin_key: Optional[str] = Header(default=None)):
+    if not settings.admin_api_key:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin API is disabled"
+        )
+    if not x_admin_key or not hmac.compare_digest(x_admin_key, settings.admin_api_key):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid admin key"
+        )
@@ -1,15 +1,16 @@
 import logging
+from config import resolve
 from database import Base, engine
 
 # ==============================================================================
 # IMPORTANT: Import all your SQLAlchemy models here!
 # ==============================================================================
-from models import Business, Page, Analytics
+from models import Business, Page, Analytics, AnalyticsDaily, PaymentEvent, PaymentTransaction, HolidayTemplate
 # ==============================================================================
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 logger.info("Creating database tables...")
-Base.metadata.create_all(bind=engine)
+Base.metadata.create_all(bind=resolve(engine))
 logger.info("Database tables created successfully.")
\ No newline at end of file
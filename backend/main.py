@@ -1,33 +1,83 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+import os
+from typing import Optional
+from fastapi import APIRouter, FastAPI
+from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from config import settings
-import uvicorn
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy.engine import Engine
+from config import Settings, configure, is_built, resolve, settings
 
-from routes import businesses, pages, analytics, auth, payment
+from routes import businesses, pages, analytics, auth, payment, templates, schedule
+from database import engine, async_engine, pool_status
+from services.analytics import view_buffer
+from services.cache import page_cache
+from services.email import email_service
+from services.payment import payment_service
+from services.payment_jobs import payment_jobs
+from services import metrics
+from services.health import readiness_probe
 
-app = FastAPI(
-    title="HolidyHours API",
-    description="API for creating and managing holiday hours pages for small businesses",
-    version="1.0.0"
-)
+# Listening on the Engine class covers every engine, including the async
+# engine's sync_engine, whenever it is first created
+metrics.instrument_engine(Engine)
 
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    view_buffer.start()
+    email_service.start()
+    await payment_jobs.start()
+    collection = None
+    if metrics.multiprocess_dir():
+        collection = metrics.PeriodicCollection(settings.metrics_export_interval)
+        collection.start()
+    yield
+    if collection is not None:
+        await collection.stop()
+    await payment_jobs.stop()
+    await payment_service.close()
+    await asyncio.to_thread(email_service.stop)
+    await view_buffer.stop()
+    await page_cache.close()
+    await async_engine.dispose()
 
-app.include_router(businesses.router)
-app.include_router(pages.router)
-app.include_router(analytics.router)
-app.include_router(auth.router)
-app.include_router(payment.router)
 
+def built_pools():
+    # The sync engine is only used by scripts, so it is reported once it exists
+    pools = [("async", async_engine)]
+    if is_built(engine):
+        pools.append(("sync", engine))
+    return [(name, resolve(pool_engine).pool) for name, pool_engine in pools]
 
-@app.get("/")
+
+def collect_service_metrics():
+    for name, pool in built_pools():
+        stats = pool_status(pool)
+        metrics.db_pool_connections.labels(name, "size").set(stats["size"])
+        metrics.db_pool_connections.labels(name, "checked_out").set(stats["checked_out"])
+        metrics.db_pool_connections.labels(name, "overflow").set(stats["overflow"])
+        metrics.count_total(metrics.db_pool_checkout_wait, stats["wait_seconds_total"], name)
+        metrics.count_total(metrics.db_pool_timeouts, stats["timeouts"], name)
+
+    cache = page_cache.stats()
+    metrics.count_total(metrics.cache_lookups, cache["hits"], "hit")
+    metrics.count_total(metrics.cache_lookups, cache["misses"], "miss")
+
+    metrics.queue_depth.labels("payment_jobs").set(payment_jobs.depth())
+    metrics.queue_depth.labels("analytics_views").set(view_buffer.pending())
+    email_queue = getattr(email_service, "queue", None)
+    if email_queue is not None:
+        metrics.queue_depth.labels("email").set(email_queue.depth())
+
+
+metrics.add_collector(collect_service_metrics)
+
+system_router = APIRouter()
+
+
+@system_router.get("/")
 def root():
     return {
         "message": "HolidyHours API",
@@ -36,10 +86,87 @@ def root():
     }
 
 
-@app.get("/health")
+# Liveness only: answers without touching the database or other services
+@system_router.get("/health")
 def health_check():
     return {"status": "ok","message":"healthy"}
 
 
+@system_router.get("/ready")
+async def readiness_check():
+    result = await readiness_probe.check()
+    status_code = 200 if result["status"] == "ready" else 503
+    return JSONResponse(result, status_code=status_code)
+
+
+@system_router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@system_router.get("/metrics/pool")
+def pool_metrics():
+    return {name: pool_status(pool) for name, pool in built_pools()}
+
+
+@system_router.get("/metrics/cache")
+def cache_metrics():
+    return page_cache.stats()
+
+
+def create_app(app_settings: Optional[Settings] = None) -> FastAPI:
+    # Passing settings replaces the environment-loaded ones and rebuilds every
+    # service from them on first use, e.g. to point tests at another database
+    if app_settings is not None:
+        configure(app_settings)
+
+    app = FastAPI(
+        title="HolidyHours API",
+        description="API for creating and managing holiday hours pages for small businesses",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    app.include_router(system_router)
+    app.include_router(businesses.router)
+    app.include_router(pages.router)
+    app.include_router(analytics.router)
+    app.include_router(auth.router)
+    app.include_router(payment.router)
+    app.include_router(templates.router)
+    app.include_router(schedule.router)
+
+    if settings.snapshots_enabled and settings.snapshot_mount_path:
+        os.makedirs(settings.snapshot_dir, exist_ok=True)
+        app.mount(
+            settings.snapshot_mount_path,
+            StaticFiles(directory=settings.snapshot_dir, html=True),
+            name="snapshots"
+        )
+
+    return app
+
+
+def __getattr__(name):
+    # `uvicorn main:app` and `main.app` build the default app on first access,
+    # so importing this module reads no settings
+    if name == "app":
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=5000)
+    import uvicorn
+    uvicorn.run(create_app(), host=settings.server_host, port=settings.server_port)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import Column, String, Integer, Text, Date, DateTime, ForeignKey, CheckConstraint
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
@@ -43,12 +43,26 @@ class Page(Base):
     holidays = Column(JSONB, nullable=False, default=list, server_default='[]')
     regular_hours = Column(JSONB, nullable=False, default=dict, server_default='{}')
     custom_css = Column(Text, nullable=True)
+    # With a template, holidays only holds this page's overrides and additions
+    template_id = Column(Text, ForeignKey('holiday_templates.id', ondelete='SET NULL'), nullable=True)
+    excluded_holidays = Column(JSONB, nullable=False, default=list, server_default='[]')
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     business = relationship("Business", back_populates="page")
     analytics = relationship("Analytics", back_populates="page", uselist=False, cascade="all, delete-orphan")
 
 
+class HolidayTemplate(Base):
+    __tablename__ = "holiday_templates"
+
+    id = Column(Text, primary_key=True)
+    name = Column(Text, nullable=False)
+    country = Column(Text, nullable=False)
+    year = Column(Integer, nullable=False)
+    holidays = Column(JSONB, nullable=False, default=list, server_default='[]')
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
 class Analytics(Base):
     __tablename__ = "analytics"
 
@@ -59,3 +73,48 @@ class Analytics(Base):
     sources = Column(JSONB, nullable=False, default=list, server_default='[]')
 
     page = relationship("Page", back_populates="analytics")
+
+
+class AnalyticsDaily(Base):
+    __tablename__ = "analytics_daily"
+
+    page_id = Column(UUID(as_uuid=True), ForeignKey('pages.id', ondelete='CASCADE'), primary_key=True)
+    day = Column(Date, primary_key=True)
+    source = Column(Text, primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default='0')
+
+
+class PaymentEvent(Base):
+    __tablename__ = "payment_events"
+
+    reference = Column(Text, primary_key=True)
+    event = Column(Text, nullable=False)
+    payload = Column(JSONB, nullable=False)
+    status = Column(
+        Text,
+        nullable=False,
+        default='received',
+        server_default='received'
+    )
+    attempts = Column(Integer, nullable=False, default=0, server_default='0')
+    received_at = Column(DateTime(timezone=True), server_default=func.now())
+    claimed_at = Column(DateTime(timezone=True), nullable=True)
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        CheckConstraint(
+            "status IN ('received', 'processing', 'processed', 'failed')",
+            name='check_payment_event_status'
+        ),
+    )
+
+
+class PaymentTransaction(Base):
+    __tablename__ = "payment_transactions"
+
+    reference = Column(Text, primary_key=True)
+    status = Column(Text, nullable=False)
+    amount = Column(Integer, nullable=False)
+    business_id = Column(Text, nullable=True)
+    email = Column(Text, nullable=True)
+    verified_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,31 @@
+import asyncio
+import logging
+import sys
+from uuid import UUID
+
+from database import async_engine
+from services.snapshots import snapshot_renderer
+
+# Usage:
+#   python rebuild_snapshots.py              re-render every page
+#   python rebuild_snapshots.py <page_id>... re-render only the given pages
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main(page_ids):
+    try:
+        if page_ids:
+            snapshot_renderer.enabled = True
+            await snapshot_renderer.regenerate_many(page_ids)
+            count = len(page_ids)
+        else:
+            count = await snapshot_renderer.rebuild_all()
+    finally:
+        await async_engine.dispose()
+    logger.info(f"Rendered {count} snapshots into {snapshot_renderer.store.directory}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main([UUID(arg) for arg in sys.argv[1:]]))
@@ -1,69 +1,66 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
-from datetime import datetime
 
-from database import get_db
-from models import Analytics
+from database import get_async_db
+from models import Analytics, AnalyticsDaily
 from schemas import (
     AnalyticsResponse,
     IncrementViewRequest
 )
+from services.analytics import view_buffer, record_view
+from config import settings
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
 
 @router.get("/{page_id}", response_model=AnalyticsResponse)
-def get_analytics(
+async def get_analytics(
     page_id: UUID,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    analytics = db.query(Analytics).filter(Analytics.page_id == page_id).first()
+    analytics = await db.scalar(select(Analytics).where(Analytics.page_id == page_id))
     if not analytics:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Analytics not found"
         )
-    return analytics
+
+    daily = await db.scalars(
+        select(AnalyticsDaily)
+        .where(AnalyticsDaily.page_id == page_id)
+        .order_by(AnalyticsDaily.day, AnalyticsDaily.source)
+    )
+
+    return AnalyticsResponse(
+        id=analytics.id,
+        page_id=analytics.page_id,
+        views=analytics.views,
+        last_viewed=analytics.last_viewed,
+        sources=[
+            {'date': row.day.isoformat(), 'source': row.source, 'count': row.count}
+            for row in daily
+        ]
+    )
 
 
 @router.post("/{page_id}/view", status_code=status.HTTP_200_OK)
-def increment_view(
+async def increment_view(
     page_id: UUID,
     request: IncrementViewRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    analytics = db.query(Analytics).filter(Analytics.page_id == page_id).first()
-    if not analytics:
+    if settings.analytics_buffer_views:
+        view_buffer.add(page_id, request.source)
+        return {"status": "success"}
+
+    views = await record_view(db, page_id, request.source)
+    if views is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Analytics not found"
         )
+    await db.commit()
 
-    analytics.views += 1
-    analytics.last_viewed = datetime.utcnow()
-
-    today = datetime.utcnow().date().isoformat()
-    sources = analytics.sources or []
-
-    source_found = False
-    for source in sources:
-        if source.get('date') == today and source.get('source') == request.source:
-            source['count'] = source.get('count', 0) + 1
-            source_found = True
-            break
-
-    if not source_found:
-        sources.append({
-            'date': today,
-            'source': request.source,
-            'count': 1
-        })
-
-    analytics.sources = sources
-
-    db.commit()
-    db.refresh(analytics)
-
-    return {"status": "success", "views": analytics.views}
+    return {"status": "success", "views": views}
@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import get_db
+from database import get_async_db
 from models import Business
 from schemas import (
     MagicLinkRequest,
@@ -9,17 +10,17 @@ from schemas import (
     TokenResponse
 )
 from services.auth import auth_service
-from services.email import email_service
+from services.email import email_service, EmailQueueFull
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
 
 @router.post("/magic-link", status_code=status.HTTP_200_OK)
-def request_magic_link(
+async def request_magic_link(
     request: MagicLinkRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    business = db.query(Business).filter(Business.id == request.business_id).first()
+    business = await db.scalar(select(Business).where(Business.id == request.business_id))
     if not business:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -43,6 +44,11 @@ def request_magic_link(
             magic_link=magic_link,
             business_name=business.name
         )
+    except EmailQueueFull:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many emails queued, please try again shortly"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -56,7 +62,7 @@ def request_magic_link(
 
 
 @router.post("/verify", response_model=TokenResponse)
-def verify_token(request: VerifyTokenRequest):
+async def verify_token(request: VerifyTokenRequest):
     try:
         payload = auth_service.verify_magic_link_token(request.token)
         return TokenResponse(
@@ -1,24 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from uuid import UUID
 
-from database import get_db
+from database import get_async_db
 from models import Business
 from schemas import (
     CreateBusinessRequest,
     UpdateBusinessRequest,
-    BusinessResponse
+    BusinessResponse,
+    BulkImportResponse,
+    AuthPrincipal
+)
+from dependencies import require_admin, require_business_owner
+from services.bulk_import import import_businesses, CSV_TYPES, NDJSON_TYPES
+from services.snapshots import snapshot_renderer
+from services.http_cache import (
+    validator_headers,
+    has_conditions,
+    is_not_modified,
+    not_modified_response
 )
-from services.auth import auth_service
 
 router = APIRouter(prefix="/api/businesses", tags=["businesses"])
 
 
 @router.post("", response_model=BusinessResponse, status_code=status.HTTP_201_CREATED)
-def create_business(
+async def create_business(
     request: CreateBusinessRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     business = Business(
         name=request.name,
@@ -29,33 +40,72 @@ def create_business(
         payment_status='pending'
     )
     db.add(business)
-    db.commit()
-    db.refresh(business)
+    await db.commit()
+    await db.refresh(business)
     print(business)
     return business
 
 
+@router.post("/bulk", response_model=BulkImportResponse, dependencies=[Depends(require_admin)])
+async def bulk_create_businesses(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # One business per CSV row or NDJSON line, each with its page and analytics
+    # rows. The body is parsed as it streams in and inserted in batches.
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in CSV_TYPES + NDJSON_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload text/csv or application/x-ndjson"
+        )
+
+    result = await import_businesses(db, request.stream(), content_type)
+    # Imported pages share their business's id
+    background_tasks.add_task(
+        snapshot_renderer.regenerate_many,
+        [created['business_id'] for created in result['created']]
+    )
+    return result
+
+
 @router.get("/{business_id}", response_model=BusinessResponse)
-def get_business(
+async def get_business(
     business_id: UUID,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    business = db.query(Business).filter(Business.id == business_id).first()
+    if has_conditions(request):
+        last_edited = await db.scalar(
+            select(Business.last_edited).where(Business.id == business_id)
+        )
+        if last_edited:
+            headers = validator_headers(business_id, last_edited)
+            if is_not_modified(request, headers, last_edited):
+                return not_modified_response(headers)
+
+    business = await db.scalar(select(Business).where(Business.id == business_id))
     if not business:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Business not found"
         )
+
+    response.headers.update(validator_headers(business.id, business.last_edited))
     return business
 
 
 @router.put("/{business_id}", response_model=BusinessResponse)
-def update_business(
+async def update_business(
     business_id: UUID,
     request: UpdateBusinessRequest,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    principal: AuthPrincipal = Depends(require_business_owner),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    business = db.query(Business).filter(Business.id == business_id).first()
+    business = await db.scalar(select(Business).where(Business.id == business_id))
     if not business:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -66,6 +116,8 @@ def update_business(
     for key, value in update_data.items():
         setattr(business, key, value)
 
-    db.commit()
-    db.refresh(business)
+    await db.commit()
+    await db.refresh(business)
+    # The public page shows business details, so its snapshot is re-rendered too
+    background_tasks.add_task(snapshot_renderer.regenerate_business, business.id)
     return business
@@ -1,24 +1,64 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
 from uuid import UUID
 
-from database import get_db
-from models import Page, Business, Analytics
+from database import get_async_db
+from models import Page, Business, Analytics, HolidayTemplate
 from schemas import (
     CreatePageRequest,
     UpdatePageRequest,
-    PageResponse
+    PatchHolidaysRequest,
+    PageResponse,
+    PageBundleResponse,
+    AuthPrincipal
+)
+from dependencies import require_page_owner
+from services.analytics import view_buffer, record_view as record_page_view
+from config import settings
+from services.cache import page_cache
+from services.schedule import schedule_cache
+from services.snapshots import snapshot_renderer
+from services.holidays import apply_patch, patch_holidays, page_exists
+from services.templates import template_resolver, merge_holidays, split_holidays, last_modified, page_payload
+from services.http_cache import (
+    validator_headers,
+    has_conditions,
+    is_not_modified,
+    not_modified_response
 )
 
 router = APIRouter(prefix="/api/pages", tags=["pages"])
 
 
+async def apply_template(db: AsyncSession, page: Page, template_id, holidays: list):
+    # Stores holidays against the template, keeping only what the page changes
+    if template_id is None:
+        page.template_id = None
+        page.holidays = holidays
+        page.excluded_holidays = []
+        return
+
+    template = await template_resolver.get_template(db, template_id)
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Holiday template not found"
+        )
+    page.template_id = template_id
+    page.holidays, page.excluded_holidays = split_holidays(template['holidays'], holidays)
+
+
 @router.post("", response_model=PageResponse, status_code=status.HTTP_201_CREATED)
-def create_page(
+async def create_page(
     request: CreatePageRequest,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    business = db.query(Business).filter(Business.id == request.business_id).first()
+    business = await db.scalar(select(Business).where(Business.id == request.business_id))
     if not business:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -28,9 +68,9 @@ def create_page(
     page = Page(
         id=request.business_id,
         business_id=request.business_id,
-        holidays=[h.model_dump() for h in request.holidays],
         regular_hours=request.regular_hours or {}
     )
+    await apply_template(db, page, request.template_id, [h.model_dump() for h in request.holidays])
     db.add(page)
 
     analytics = Analytics(
@@ -41,59 +81,243 @@ def create_page(
     )
     db.add(analytics)
 
-    db.commit()
-    db.refresh(page)
-    return page
+    await db.commit()
+    await db.refresh(page)
+    await page_cache.invalidate(page.id, page.business_id)
+    background_tasks.add_task(snapshot_renderer.regenerate, page.id)
+    return await page_payload(db, page)
 
 
-@router.get("/{page_id}", response_model=PageResponse)
-def get_page(
-    page_id: UUID,
-    db: Session = Depends(get_db)
-):
-    page = db.query(Page).filter(Page.id == page_id).first()
+async def load_page_payload(db: AsyncSession, condition):
+    page = await db.scalar(select(Page).where(condition))
     if not page:
+        return None
+    return PageResponse.model_validate(page).model_dump(mode="json")
+
+
+async def load_page_version(db: AsyncSession, condition):
+    return (await db.execute(
+        select(Page.id, Page.updated_at, HolidayTemplate.updated_at.label('template_updated_at'))
+        .outerjoin(HolidayTemplate, Page.template_id == HolidayTemplate.id)
+        .where(condition)
+    )).first()
+
+
+async def get_cached_page(db: AsyncSession, cache_key: str, condition):
+    # Returns the cached payload (None on a miss) and, when the hit was checked
+    # against the database, the template's updated_at
+    payload = await page_cache.get(cache_key)
+    template_updated_at = None
+
+    if payload is not None and page_cache.revalidate:
+        # Each worker has its own memory cache and misses the others'
+        # invalidations, so a hit is only served if the row has not changed
+        row = await load_page_version(db, condition)
+        if row is None or datetime.fromisoformat(payload['updated_at']) != row.updated_at:
+            payload = None
+        if row is not None:
+            template_updated_at = row.template_updated_at
+    return payload, template_updated_at
+
+
+async def load_and_cache_page(db: AsyncSession, cache_key: str, condition):
+    generation = await page_cache.generation()
+    payload = await load_page_payload(db, condition)
+    if not payload:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Page not found"
         )
-    return page
+    await page_cache.set(cache_key, payload, generation)
+    return payload
+
+
+async def serve_page(request: Request, db: AsyncSession, cache_key: str, condition):
+    payload, template_updated_at = await get_cached_page(db, cache_key, condition)
+
+    if payload is None:
+        if has_conditions(request):
+            # Answer revalidations from the timestamps alone, without loading holidays
+            row = await load_page_version(db, condition)
+            if row:
+                modified = max(filter(None, (row.updated_at, row.template_updated_at)))
+                headers = validator_headers(row.id, modified)
+                if is_not_modified(request, headers, modified):
+                    return not_modified_response(headers)
+        payload = await load_and_cache_page(db, cache_key, condition)
+
+    # The cache holds the page's own row; template holidays are merged per request
+    payload = await template_resolver.resolve(db, payload, template_updated_at)
+    modified = last_modified(payload)
+    headers = validator_headers(UUID(payload['id']), modified)
+    if is_not_modified(request, headers, modified):
+        return not_modified_response(headers)
+    return JSONResponse(payload, headers=headers)
+
+
+@router.get("/{page_id}", response_model=PageResponse)
+async def get_page(
+    page_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
+):
+    return await serve_page(request, db, page_cache.page_key(page_id), Page.id == page_id)
 
 
 @router.get("/business/{business_id}", response_model=PageResponse)
-def get_page_by_business(
+async def get_page_by_business(
     business_id: UUID,
-    db: Session = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    page = db.query(Page).filter(Page.business_id == business_id).first()
-    if not page:
+    return await serve_page(
+        request,
+        db,
+        page_cache.business_key(business_id),
+        Page.business_id == business_id
+    )
+
+
+@router.get("/public/{business_id}", response_model=PageBundleResponse)
+async def get_public_page(
+    business_id: UUID,
+    request: Request,
+    record_view: bool = False,
+    source: str = 'direct',
+    db: AsyncSession = Depends(get_async_db)
+):
+    business = await db.scalar(select(Business).where(Business.id == business_id))
+    if not business:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Page not found"
         )
-    return page
+
+    # The page part comes from the same cache entry as /business/{business_id}
+    cache_key = page_cache.business_key(business_id)
+    condition = Page.business_id == business_id
+    payload, template_updated_at = await get_cached_page(db, cache_key, condition)
+    if payload is None:
+        payload = await load_and_cache_page(db, cache_key, condition)
+    page = await template_resolver.resolve(db, payload, template_updated_at)
+
+    if record_view:
+        if settings.analytics_buffer_views:
+            view_buffer.add(UUID(page['id']), source)
+        else:
+            await record_page_view(db, UUID(page['id']), source)
+            await db.commit()
+
+    modified = max(filter(None, (last_modified(page), business.last_edited)))
+    headers = validator_headers(business.id, modified)
+    if is_not_modified(request, headers, modified):
+        return not_modified_response(headers)
+    bundle = PageBundleResponse(business=business, page=page)
+    return JSONResponse(bundle.model_dump(mode="json"), headers=headers)
 
 
 @router.put("/{page_id}", response_model=PageResponse)
-def update_page(
+async def update_page(
     page_id: UUID,
     request: UpdatePageRequest,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    principal: AuthPrincipal = Depends(require_page_owner),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    page = db.query(Page).filter(Page.id == page_id).first()
+    page = await db.scalar(select(Page).where(Page.id == page_id))
     if not page:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Page not found"
         )
 
-    if request.holidays is not None:
-        page.holidays = [h.model_dump() for h in request.holidays]
+    template_changed = 'template_id' in request.model_fields_set
+    if request.holidays is not None or template_changed:
+        if request.holidays is not None:
+            holidays = [h.model_dump() for h in request.holidays]
+        else:
+            # Switching templates keeps the holidays the page currently shows
+            holidays = (await page_payload(db, page))['holidays']
+        template_id = request.template_id if template_changed else page.template_id
+        await apply_template(db, page, template_id, holidays)
     if request.regular_hours is not None:
         page.regular_hours = request.regular_hours
     if request.custom_css is not None:
         page.custom_css = request.custom_css
 
-    db.commit()
-    db.refresh(page)
+    await db.commit()
+    await db.refresh(page)
+    await page_cache.invalidate(page.id, page.business_id)
+    schedule_cache.invalidate(page.id)
+    background_tasks.add_task(snapshot_renderer.regenerate, page.id)
+    return await page_payload(db, page)
+
+
+async def patch_template_holidays(
+    db: AsyncSession,
+    page_id: UUID,
+    upserts: list,
+    removes: list,
+    expected_updated_at: Optional[datetime] = None
+) -> Optional[Page]:
+    # Template holidays live in the template, so MERGED_HOLIDAYS cannot edit
+    # them in place. The row is locked, the edit applied to the merged list and
+    # the result split again; removing a template holiday excludes it.
+    page = await db.scalar(select(Page).where(Page.id == page_id).with_for_update())
+    if not page or (expected_updated_at is not None and page.updated_at != expected_updated_at):
+        return None
+    template = await template_resolver.get_template(db, page.template_id)
+    if template is None:
+        page.holidays = apply_patch(page.holidays, upserts, removes)
+    else:
+        merged = merge_holidays(template['holidays'], page.holidays, page.excluded_holidays)
+        page.holidays, page.excluded_holidays = split_holidays(
+            template['holidays'],
+            apply_patch(merged, upserts, removes)
+        )
+    page.updated_at = func.now()
+    await db.flush()
+    await db.refresh(page)
     return page
+
+
+@router.patch("/{page_id}/holidays", response_model=PageResponse)
+async def update_page_holidays(
+    page_id: UUID,
+    request: PatchHolidaysRequest,
+    background_tasks: BackgroundTasks,
+    principal: AuthPrincipal = Depends(require_page_owner),
+    db: AsyncSession = Depends(get_async_db)
+):
+    removed = {(h.name, h.date) for h in request.remove}
+    if any((h.name, h.date) in removed for h in request.upsert):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A holiday cannot be upserted and removed in the same request"
+        )
+
+    template_id = await db.scalar(select(Page.template_id).where(Page.id == page_id))
+    patch = patch_template_holidays if template_id else patch_holidays
+    page = await patch(
+        db,
+        page_id,
+        upserts=[h.model_dump() for h in request.upsert],
+        removes=[h.model_dump() for h in request.remove],
+        expected_updated_at=request.expected_updated_at
+    )
+    if not page:
+        if not await page_exists(db, page_id):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Page not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Page was modified since it was loaded"
+        )
+
+    await db.commit()
+    await page_cache.invalidate(page.id, page.business_id)
+    schedule_cache.invalidate(page.id)
+    background_tasks.add_task(snapshot_renderer.regenerate, page.id)
+    return await page_payload(db, page)
@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import json
+from typing import Optional
 
-from database import get_db
-from models import Business
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
+from models import Business, PaymentEvent, PaymentTransaction
 from schemas import (
     PaymentInitializeRequest,
     PaymentInitializeResponse,
     PaymentVerifyResponse
 )
 from services.payment import payment_service
-from services.email import email_service
+from services.payment_jobs import exhausted, payment_jobs, record_event, settle_verification, verify_signature
 from config import settings
 
 router = APIRouter(prefix="/api/payment", tags=["payment"])
@@ -18,9 +22,9 @@ router = APIRouter(prefix="/api/payment", tags=["payment"])
 @router.post("/initialize", response_model=PaymentInitializeResponse)
 async def initialize_payment(
     request: PaymentInitializeRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
-    business = db.query(Business).filter(Business.id == request.business_id).first()
+    business = await db.scalar(select(Business).where(Business.id == request.business_id))
     if not business:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -50,57 +54,48 @@ async def initialize_payment(
 @router.get("/verify/{reference}", response_model=PaymentVerifyResponse)
 async def verify_payment(
     reference: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     try:
-        result = await payment_service.verify_payment(reference)
-
-        if result['status'] == 'success':
-            business_id = result['metadata'].get('business_id')
-            if business_id:
-                business = db.query(Business).filter(
-                    Business.id == business_id
-                ).first()
-
-                if business:
-                    business.payment_status = 'paid'
-                    business.paystack_customer_id = result.get('customer', {}).get('customer_code')
-                    db.commit()
-
-                    page_url = f"{settings.frontend_url}/b/{business_id}"
-                    try:
-                        email_service.send_payment_receipt(
-                            to_email=business.email,
-                            business_name=business.name,
-                            amount=result['amount'] / 100,
-                            reference=reference,
-                            page_url=page_url
-                        )
-                    except Exception as e:
-                        print(f"Failed to send receipt: {str(e)}")
-
-            return PaymentVerifyResponse(
-                status=result['status'],
-                amount=result['amount'],
-                reference=reference,
-                business_id=business_id,
-                email=result.get('customer', {}).get('email', '')
-            )
-        else:
-            business_id = result['metadata'].get('business_id')
-            if business_id:
-                business = db.query(Business).filter(
-                    Business.id == business_id
-                ).first()
-                if business:
-                    business.payment_status = 'failed'
-                    db.commit()
-
+        # Settled references are answered locally without calling Paystack
+        transaction = await db.scalar(
+            select(PaymentTransaction).where(PaymentTransaction.reference == reference)
+        )
+        if transaction is not None and transaction.status == 'success':
+            # The transaction row is committed before the event is recorded;
+            # verify again when it was never recorded, and otherwise leave the
+            # event to the job queue
+            event = (await db.execute(
+                select(PaymentEvent.status, PaymentEvent.attempts)
+                .where(PaymentEvent.reference == reference)
+            )).first()
+            if event is None:
+                transaction = None
+            elif exhausted(event.status, event.attempts):
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Payment succeeded but could not be applied"
+                )
+            elif event.status != 'processed':
+                payment_jobs.enqueue(reference)
+        if transaction is None:
+            result = await payment_service.verify_payment_coalesced(reference)
+            transaction = await settle_verification(db, reference, result)
+
+        if transaction.status != 'success':
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Payment was not successful"
             )
 
+        return PaymentVerifyResponse(
+            status=transaction.status,
+            amount=transaction.amount,
+            reference=reference,
+            business_id=transaction.business_id,
+            email=transaction.email
+        )
+
     except HTTPException:
         raise
     except Exception as e:
@@ -112,23 +107,30 @@ async def verify_payment(
 
 @router.post("/webhook")
 async def payment_webhook(
-    payload: dict,
-    db: Session = Depends(get_db)
+    request: Request,
+    x_paystack_signature: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    event = payload.get('event')
-
-    if event == 'charge.success':
-        data = payload.get('data', {})
-        business_id = data.get('metadata', {}).get('business_id')
+    body = await request.body()
+    if not verify_signature(body, x_paystack_signature):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid signature"
+        )
 
-        if business_id:
-            business = db.query(Business).filter(
-                Business.id == business_id
-            ).first()
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid payload"
+        )
 
-            if business:
-                business.payment_status = 'paid'
-                business.paystack_customer_id = data.get('customer', {}).get('customer_code')
-                db.commit()
+    # Record and acknowledge; the status update and receipt happen in the worker
+    if payload.get('event') == 'charge.success':
+        data = payload.get('data') or {}
+        reference = data.get('reference')
+        if reference and await record_event(db, reference, 'charge.success', data):
+            payment_jobs.enqueue(reference)
 
     return {"status": "success"}
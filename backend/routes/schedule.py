@@ -0,0 +1,115 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from database import get_async_db
+from models import Page, HolidayTemplate
+from schemas import ScheduleStatusResponse, ScheduleBatchRequest, ScheduleBatchResponse
+from config import settings
+from services.schedule import schedule_cache
+from services.templates import page_payload
+
+router = APIRouter(prefix="/api/schedule", tags=["schedule"])
+
+
+def resolve_zone(tz: Optional[str]) -> ZoneInfo:
+    try:
+        return ZoneInfo(tz or settings.schedule_default_timezone)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown timezone: {tz}"
+        )
+
+
+def _version(payload: dict) -> tuple:
+    template_updated_at = payload.get('template_updated_at')
+    return (
+        datetime.fromisoformat(payload['updated_at']),
+        datetime.fromisoformat(template_updated_at) if template_updated_at else None
+    )
+
+
+async def page_schedules(db: AsyncSession, page_ids: List[UUID], zone: ZoneInfo, at: Optional[datetime]) -> list:
+    if at is None:
+        at = datetime.now(timezone.utc)
+    elif at.tzinfo is None:
+        at = at.replace(tzinfo=timezone.utc)
+    # Indexes hold local wall-clock times, so queries use the same
+    local = at.astimezone(zone).replace(tzinfo=None)
+
+    # Check cached indexes against the current timestamps before loading any holidays
+    rows = await db.execute(
+        select(Page.id, Page.updated_at, HolidayTemplate.updated_at.label('template_updated_at'))
+        .outerjoin(HolidayTemplate, Page.template_id == HolidayTemplate.id)
+        .where(Page.id.in_(page_ids))
+    )
+    indexes = {}
+    missing = []
+    for row in rows:
+        index = schedule_cache.get(row.id, (row.updated_at, row.template_updated_at), local)
+        if index is None:
+            missing.append(row.id)
+        else:
+            indexes[row.id] = index
+
+    if missing:
+        for page in await db.scalars(select(Page).where(Page.id.in_(missing))):
+            payload = await page_payload(db, page)
+            indexes[page.id] = schedule_cache.compile(page.id, _version(payload), payload, local)
+
+    def aware(value: Optional[datetime]) -> Optional[datetime]:
+        return value.replace(tzinfo=zone) if value is not None else None
+
+    return [
+        ScheduleStatusResponse(
+            page_id=page_id,
+            timezone=zone.key,
+            at=aware(local),
+            is_open=indexes[page_id].is_open(local),
+            next_opening=aware(indexes[page_id].next_opening(local)),
+            next_closing=aware(indexes[page_id].next_closing(local))
+        )
+        for page_id in page_ids
+        if page_id in indexes
+    ]
+
+
+@router.get("/{page_id}", response_model=ScheduleStatusResponse)
+async def get_schedule(
+    page_id: UUID,
+    tz: Optional[str] = None,
+    at: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    schedules = await page_schedules(db, [page_id], resolve_zone(tz), at)
+    if not schedules:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Page not found"
+        )
+    return schedules[0]
+
+
+@router.post("/batch", response_model=ScheduleBatchResponse)
+async def get_schedules(
+    request: ScheduleBatchRequest,
+    db: AsyncSession = Depends(get_async_db)
+):
+    page_ids = list(dict.fromkeys(request.page_ids))
+    if len(page_ids) > settings.schedule_batch_max:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.schedule_batch_max} page ids per request"
+        )
+
+    schedules = await page_schedules(db, page_ids, resolve_zone(request.tz), request.at)
+    found = {schedule.page_id for schedule in schedules}
+    return ScheduleBatchResponse(
+        schedules=schedules,
+        not_found=[page_id for page_id in page_ids if page_id not in found]
+    )
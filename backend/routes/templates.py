@@ -0,0 +1,73 @@
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from database import get_async_db
+from models import HolidayTemplate
+from schemas import HolidayTemplateRequest, HolidayTemplateResponse
+from dependencies import require_admin
+from services.templates import template_resolver
+from services.snapshots import snapshot_renderer
+
+router = APIRouter(prefix="/api/templates", tags=["templates"])
+
+
+@router.get("", response_model=List[HolidayTemplateResponse])
+async def list_templates(
+    country: Optional[str] = None,
+    year: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    query = select(HolidayTemplate).order_by(HolidayTemplate.country, HolidayTemplate.year, HolidayTemplate.id)
+    if country is not None:
+        query = query.where(HolidayTemplate.country == country)
+    if year is not None:
+        query = query.where(HolidayTemplate.year == year)
+    return (await db.scalars(query)).all()
+
+
+@router.get("/{template_id}", response_model=HolidayTemplateResponse)
+async def get_template(
+    template_id: str,
+    db: AsyncSession = Depends(get_async_db)
+):
+    template = await template_resolver.get_template(db, template_id)
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Holiday template not found"
+        )
+    return template
+
+
+@router.put("/{template_id}", response_model=HolidayTemplateResponse, dependencies=[Depends(require_admin)])
+async def put_template(
+    template_id: str,
+    request: HolidayTemplateRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Creates the template or replaces it in place, e.g. to roll it over to a new
+    # year; every page using it picks up the change without being rewritten
+    values = {
+        'name': request.name,
+        'country': request.country,
+        'year': request.year,
+        'holidays': [h.model_dump() for h in request.holidays],
+    }
+    template = await db.scalar(
+        pg_insert(HolidayTemplate)
+        .values(id=template_id, **values)
+        .on_conflict_do_update(
+            index_elements=[HolidayTemplate.id],
+            set_={**values, 'updated_at': func.now()}
+        )
+        .returning(HolidayTemplate),
+        execution_options={'populate_existing': True}
+    )
+    await db.commit()
+    await template_resolver.invalidate(template_id)
+    background_tasks.add_task(snapshot_renderer.regenerate_template, template_id)
+    return template
@@ -34,6 +34,26 @@ class UpdateBusinessRequest(BaseModel):
     type: Optional[str] = None
 
 
+class BulkBusinessRow(CreateBusinessRequest):
+    holidays: List[HolidaySchema] = []
+    regular_hours: Optional[dict] = {}
+
+
+class BulkImportCreated(BaseModel):
+    row: int
+    business_id: UUID
+
+
+class BulkImportError(BaseModel):
+    row: int
+    error: str
+
+
+class BulkImportResponse(BaseModel):
+    created: List[BulkImportCreated]
+    errors: List[BulkImportError]
+
+
 class BusinessResponse(BaseModel):
     id: UUID
     name: str
@@ -54,12 +74,33 @@ class CreatePageRequest(BaseModel):
     business_id: UUID
     holidays: List[HolidaySchema]
     regular_hours: Optional[dict] = {}
+    template_id: Optional[str] = None
 
 
 class UpdatePageRequest(BaseModel):
     holidays: Optional[List[HolidaySchema]] = None
     regular_hours: Optional[dict] = None
     custom_css: Optional[str] = None
+    template_id: Optional[str] = None
+
+
+class HolidayKey(BaseModel):
+    name: str
+    date: str
+
+
+class PatchHolidaysRequest(BaseModel):
+    upsert: List[HolidaySchema] = []
+    remove: List[HolidayKey] = []
+    expected_updated_at: Optional[datetime] = None
+
+    @field_validator('upsert')
+    @classmethod
+    def unique_upserts(cls, v):
+        keys = [(h.name, h.date) for h in v]
+        if len(keys) != len(set(keys)):
+            raise ValueError('Each holiday may only be upserted once per request')
+        return v
 
 
 class PageResponse(BaseModel):
@@ -68,12 +109,59 @@ class PageResponse(BaseModel):
     holidays: List[dict]
     regular_hours: dict
     custom_css: Optional[str]
+    template_id: Optional[str] = None
+    excluded_holidays: List[dict] = []
     updated_at: datetime
+    template_updated_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
 
 
+class HolidayTemplateRequest(BaseModel):
+    name: str
+    country: str
+    year: int
+    holidays: List[HolidaySchema]
+
+
+class HolidayTemplateResponse(BaseModel):
+    id: str
+    name: str
+    country: str
+    year: int
+    holidays: List[dict]
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PageBundleResponse(BaseModel):
+    business: BusinessResponse
+    page: PageResponse
+
+
+class ScheduleStatusResponse(BaseModel):
+    page_id: UUID
+    timezone: str
+    at: datetime
+    is_open: bool
+    next_opening: Optional[datetime]
+    next_closing: Optional[datetime]
+
+
+class ScheduleBatchRequest(BaseModel):
+    page_ids: List[UUID]
+    tz: Optional[str] = None
+    at: Optional[datetime] = None
+
+
+class ScheduleBatchResponse(BaseModel):
+    schedules: List[ScheduleStatusResponse]
+    not_found: List[UUID]
+
+
 class AnalyticsResponse(BaseModel):
     id: UUID
     page_id: UUID
@@ -104,6 +192,12 @@ class TokenResponse(BaseModel):
     exp: int
 
 
+class AuthPrincipal(BaseModel):
+    business_id: UUID
+    email: str
+    exp: int
+
+
 class PaymentInitializeRequest(BaseModel):
     business_id: UUID
     email: EmailStr
@@ -0,0 +1,160 @@
+import math
+import os
+import shutil
+import tempfile
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+from config import is_built, reset_services, resolve, settings
+from database import engine, async_engine
+
+# Production entrypoint: gunicorn supervises several uvicorn workers, restarts
+# them when they crash or hit server_max_requests, and drains them on SIGTERM.
+# Configured through Settings (SERVER_* environment variables).
+#
+#   python server.py
+#
+# `uvicorn main:app --reload` (or `python main.py`) stays the single-process
+# development server.
+
+
+def available_cpus() -> int:
+    # os.cpu_count() reports the host's CPUs; the process may be limited to
+    # fewer by its affinity mask or a container CPU quota
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+
+    quota = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            limit, period = f.read().split()
+        if limit != "max":
+            quota = int(limit) / int(period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                limit = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+            if limit > 0:
+                quota = limit / period
+        except (OSError, ValueError):
+            pass
+
+    if quota is not None:
+        count = min(count, math.ceil(quota))
+    return max(1, count)
+
+
+def worker_count() -> int:
+    if settings.server_workers > 0:
+        return settings.server_workers
+    return max(1, min(available_cpus(), settings.server_max_workers))
+
+
+class Worker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": settings.server_loop,
+        "http": settings.server_http,
+        # Stop waiting for in-flight requests after this, so lifespan shutdown
+        # still runs within gunicorn's graceful_timeout
+        "timeout_graceful_shutdown": settings.server_drain_timeout,
+    }
+
+
+temporary_dirs = []
+
+
+def share_process_state(workers: int):
+    # Caches, buffers and counters live in each worker process
+    if workers < 2:
+        return
+    if settings.cache_backend == "memory" and not settings.cache_revalidate:
+        print("CACHE_BACKEND=memory with several workers: cache hits are checked "
+              "against the database; use CACHE_BACKEND=redis to share one cache")
+        settings.cache_revalidate = True
+    if not settings.metrics_dir:
+        settings.metrics_dir = tempfile.mkdtemp(prefix="holidyhours-metrics-")
+        temporary_dirs.append(settings.metrics_dir)
+    os.makedirs(settings.metrics_dir, exist_ok=True)
+    # Files left by a previous run would be added to this one's totals
+    for name in os.listdir(settings.metrics_dir):
+        if name.endswith(".db"):
+            os.unlink(os.path.join(settings.metrics_dir, name))
+    # prometheus_client reads this when first imported, which is after this
+    # (the app, and with it services.metrics, is loaded by gunicorn)
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = settings.metrics_dir
+
+
+def on_starting(server):
+    workers = server.cfg.workers
+    connections = workers * (settings.db_pool_size + settings.db_max_overflow)
+    print(f"Starting {workers} workers on {settings.server_host}:{settings.server_port}, "
+          f"up to {connections} database connections")
+    if settings.server_graceful_timeout <= settings.server_drain_timeout + settings.email_shutdown_timeout:
+        print("SERVER_GRACEFUL_TIMEOUT leaves no time to drain email after requests; "
+              "workers may be killed before queued email is sent")
+
+
+def post_fork(server, worker):
+    # Nothing opens connections before the fork (the app is built lazily), but
+    # engines that do exist must not share the parent's sockets
+    if is_built(engine):
+        resolve(engine).dispose(close=False)
+    if is_built(async_engine):
+        resolve(async_engine).sync_engine.dispose(close=False)
+    reset_services()
+
+
+def child_exit(server, worker):
+    # Drops the exited worker's gauges; its counters stay in the totals
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    for directory in temporary_dirs:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+class Server(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from main import create_app
+        return create_app()
+
+
+def options(workers: int) -> dict:
+    return {
+        "bind": f"{settings.server_host}:{settings.server_port}",
+        "workers": workers,
+        "worker_class": "server.Worker",
+        "keepalive": settings.server_keepalive,
+        "backlog": settings.server_backlog,
+        "timeout": settings.server_timeout,
+        "graceful_timeout": settings.server_graceful_timeout,
+        "max_requests": settings.server_max_requests,
+        "max_requests_jitter": settings.server_max_requests_jitter,
+        "preload_app": settings.server_preload,
+        "on_starting": on_starting,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+        "on_exit": on_exit,
+    }
+
+
+if __name__ == "__main__":
+    workers = worker_count()
+    share_process_state(workers)
+    Server(options(workers)).run()
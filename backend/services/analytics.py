@@ -0,0 +1,181 @@
+import asyncio
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, update, func, bindparam, literal, Date, Integer, Text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import Lazy, settings
+from database import AsyncSessionLocal
+from models import Analytics, AnalyticsDaily
+
+
+# Aggregates views per (page_id, day, source) in memory and flushes them to the
+# analytics and analytics_daily tables in batches, on a timer or once
+# flush_threshold views are pending.
+class ViewBuffer:
+    def __init__(self, flush_interval: float, flush_threshold: int):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self._counts = defaultdict(int)
+        self._last_viewed = {}
+        self._pending = 0
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._task = None
+
+    def add(self, page_id: UUID, source: str, count: int = 1):
+        now = datetime.utcnow()
+        key = (page_id, now.date(), source)
+        self._counts[key] += count
+        self._last_viewed[page_id] = now
+        self._pending += count
+        if self._pending >= self.flush_threshold:
+            self._wakeup.set()
+
+    def pending(self) -> int:
+        return self._pending
+
+    def _drain(self):
+        counts, self._counts = self._counts, defaultdict(int)
+        last_viewed, self._last_viewed = self._last_viewed, {}
+        self._pending = 0
+        return counts, last_viewed
+
+    def _restore(self, counts: dict, last_viewed: dict):
+        for key, count in counts.items():
+            self._counts[key] += count
+            self._pending += count
+        for page_id, viewed_at in last_viewed.items():
+            current = self._last_viewed.get(page_id)
+            if current is None or viewed_at > current:
+                self._last_viewed[page_id] = viewed_at
+
+    async def flush(self) -> int:
+        counts, last_viewed = self._drain()
+        if not counts:
+            return 0
+
+        try:
+            # Closing the session rolls back whatever did not commit
+            async with AsyncSessionLocal() as db:
+                await self._apply(db, counts, last_viewed)
+                await db.commit()
+        except Exception as e:
+            # Put the views back so the next flush retries them
+            self._restore(counts, last_viewed)
+            print(f"Failed to flush analytics views: {str(e)}")
+            return 0
+
+        return sum(counts.values())
+
+    async def _apply(self, db: AsyncSession, counts: dict, last_viewed: dict):
+        known = set(
+            await db.scalars(
+                select(Analytics.page_id).where(Analytics.page_id.in_(list(last_viewed)))
+            )
+        )
+        # Views for unknown pages are dropped here
+        if not known:
+            return
+
+        views = defaultdict(int)
+        daily_rows = []
+        for (page_id, day, source), count in sorted(counts.items()):
+            if page_id not in known:
+                continue
+            views[page_id] += count
+            daily_rows.append({'page_id': page_id, 'day': day, 'source': source, 'count': count})
+
+        analytics = Analytics.__table__
+        await db.execute(
+            update(analytics)
+            .where(analytics.c.page_id == bindparam('b_page_id'))
+            .values(
+                views=analytics.c.views + bindparam('b_views'),
+                last_viewed=func.greatest(analytics.c.last_viewed, bindparam('b_last_viewed'))
+            ),
+            [
+                {'b_page_id': page_id, 'b_views': count, 'b_last_viewed': last_viewed[page_id]}
+                for page_id, count in views.items()
+            ]
+        )
+
+        insert_stmt = pg_insert(AnalyticsDaily).values(daily_rows)
+        await db.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=[AnalyticsDaily.page_id, AnalyticsDaily.day, AnalyticsDaily.source],
+                set_={'count': AnalyticsDaily.count + insert_stmt.excluded.count}
+            )
+        )
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                await self.flush()
+            except Exception as e:
+                # A dead task would leave every later view unflushed
+                print(f"Analytics flush loop failed: {str(e)}")
+
+    def start(self):
+        if self._task is not None:
+            return
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        await self._task
+        self._task = None
+        await self.flush()
+
+
+async def record_view(db: AsyncSession, page_id: UUID, source: str, count: int = 1) -> Optional[int]:
+    # Bumps views/last_viewed and the daily bucket in a single statement and returns
+    # the new total, or None when the page has no analytics row. The caller commits.
+    now = datetime.utcnow()
+
+    bumped = (
+        update(Analytics)
+        .where(Analytics.page_id == page_id)
+        .values(views=Analytics.views + count, last_viewed=now)
+        .returning(Analytics.page_id, Analytics.views)
+        .cte('bumped')
+    )
+
+    insert_stmt = pg_insert(AnalyticsDaily).from_select(
+        ['page_id', 'day', 'source', 'count'],
+        select(
+            bumped.c.page_id,
+            literal(now.date(), Date),
+            literal(source, Text),
+            literal(count, Integer)
+        )
+    )
+    rolled = (
+        insert_stmt.on_conflict_do_update(
+            index_elements=[AnalyticsDaily.page_id, AnalyticsDaily.day, AnalyticsDaily.source],
+            set_={'count': AnalyticsDaily.count + insert_stmt.excluded.count}
+        )
+        .returning(AnalyticsDaily.count)
+        .cte('rolled')
+    )
+
+    return (await db.scalars(select(bumped.c.views).add_cte(rolled))).first()
+
+
+view_buffer = Lazy(lambda: ViewBuffer(
+    flush_interval=settings.analytics_flush_interval,
+    flush_threshold=settings.analytics_flush_threshold
+))
@@ -1,12 +1,23 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
 from itsdangerous import URLSafeTimedSerializer, SignatureExpired, BadSignature
-from config import settings
+from config import Lazy, settings
 from datetime import datetime, timedelta
 
 
 class AuthService:
     def __init__(self):
-        self.serializer = URLSafeTimedSerializer(settings.secret_key)
+        # Signs with the current key and still accepts tokens signed with any of
+        # the previous ones, so SECRET_KEY can be rotated without logging everyone out
+        self.serializer = URLSafeTimedSerializer(settings.signing_keys)
         self.expiry = settings.magic_link_expiry
+        self.cache_size = settings.token_cache_size
+        self._verified = OrderedDict()
+        # get_principal runs in the threadpool, so requests share the cache
+        # across threads
+        self._lock = threading.Lock()
 
     def generate_magic_link_token(self, email: str, business_id: str) -> str:
         payload = {
@@ -17,21 +28,38 @@ class AuthService:
         return self.serializer.dumps(payload, salt='magic-link')
 
     def verify_magic_link_token(self, token: str) -> dict:
+        # Tokens that already verified are served from a bounded LRU until their exp
+        digest = hashlib.sha256(token.encode()).digest()
+        with self._lock:
+            cached = self._verified.get(digest)
+            if cached is not None:
+                if cached['exp'] > time.time():
+                    self._verified.move_to_end(digest)
+                    return dict(cached)
+                del self._verified[digest]
+                raise ValueError('Token has expired')
+
         try:
             payload = self.serializer.loads(
                 token,
                 salt='magic-link',
                 max_age=self.expiry
             )
-            return payload
         except SignatureExpired:
             raise ValueError('Token has expired')
         except BadSignature:
             raise ValueError('Invalid token')
 
+        if self.cache_size > 0:
+            with self._lock:
+                self._verified[digest] = payload
+                while len(self._verified) > self.cache_size:
+                    self._verified.popitem(last=False)
+        return dict(payload)
+
     def create_magic_link(self, email: str, business_id: str) -> str:
         token = self.generate_magic_link_token(email, business_id)
         return f"{settings.frontend_url}/dashboard/{business_id}?token={token}"
 
 
-auth_service = AuthService()
+auth_service = Lazy(AuthService)
@@ -0,0 +1,198 @@
+import codecs
+import csv
+import json
+import uuid
+from typing import AsyncIterator, Optional
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import Business, Page, Analytics
+from schemas import BulkBusinessRow
+
+CSV_TYPES = ('text/csv', 'application/csv')
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/x-jsonlines')
+
+# CSV columns holding JSON documents rather than plain text
+JSON_COLUMNS = ('holidays', 'regular_hours')
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer = ''
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer.rstrip('\r')
+
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple]:
+    header = None
+    row_number = 0
+    pending = []
+    async for line in lines:
+        pending.append(line + '\n')
+        # A quoted field may contain newlines. csv.reader in strict mode reports
+        # one left open at the end of the lines read so far; read another line.
+        try:
+            values = next(csv.reader(pending, strict=True), [])
+        except csv.Error as e:
+            if str(e) == 'unexpected end of data':
+                continue
+            # Anything else strict mode rejects is parsed leniently, as before
+            values = next(csv.reader(pending), [])
+        pending = []
+        if not any(value.strip() for value in values):
+            continue
+
+        if header is None:
+            header = [column.strip().lower() for column in values]
+            continue
+
+        row_number += 1
+        if len(values) > len(header):
+            yield row_number, ValueError(f"Expected {len(header)} columns, got {len(values)}")
+            continue
+
+        record = {}
+        try:
+            for column, value in zip(header, values):
+                if value == '':
+                    continue
+                record[column] = json.loads(value) if column in JSON_COLUMNS else value
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"{column}: invalid JSON ({e.msg})")
+            continue
+        yield row_number, record
+
+    if pending:
+        yield row_number + 1, ValueError("Unterminated quoted field")
+
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[tuple]:
+    row_number = 0
+    async for line in lines:
+        if not line.strip():
+            continue
+        row_number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield row_number, ValueError(f"Invalid JSON ({e.msg})")
+            continue
+        if not isinstance(record, dict):
+            yield row_number, ValueError("Expected a JSON object")
+            continue
+        yield row_number, record
+
+
+def _format_errors(error: ValidationError) -> str:
+    return '; '.join(
+        f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" if e['loc'] else e['msg']
+        for e in error.errors()
+    )
+
+
+class BulkImporter:
+    def __init__(self, db: AsyncSession, batch_size: int):
+        self.db = db
+        self.batch_size = batch_size
+        self.batch = []
+        self.created = []
+        self.errors = []
+
+    def reject(self, row: int, error: str):
+        self.errors.append({'row': row, 'error': error})
+
+    async def add(self, row: int, record: dict):
+        try:
+            data = BulkBusinessRow.model_validate(record)
+        except ValidationError as e:
+            self.reject(row, _format_errors(e))
+            return
+
+        self.batch.append((row, uuid.uuid4(), data))
+        if len(self.batch) >= self.batch_size:
+            await self.flush()
+
+    async def flush(self):
+        batch, self.batch = self.batch, []
+        if not batch:
+            return
+
+        # Ids are generated here so pages and analytics rows can reference their
+        # business without a RETURNING round trip
+        businesses, pages, analytics = [], [], []
+        for _, business_id, data in batch:
+            businesses.append({
+                'id': business_id,
+                'name': data.name,
+                'email': data.email,
+                'phone': data.phone,
+                'address': data.address,
+                'type': data.type,
+                'payment_status': 'pending'
+            })
+            pages.append({
+                'id': business_id,
+                'business_id': business_id,
+                'holidays': [h.model_dump() for h in data.holidays],
+                'regular_hours': data.regular_hours or {}
+            })
+            analytics.append({
+                'id': business_id,
+                'page_id': business_id,
+                'views': 0,
+                'sources': []
+            })
+
+        try:
+            await self.db.execute(insert(Business).values(businesses))
+            await self.db.execute(insert(Page).values(pages))
+            await self.db.execute(insert(Analytics).values(analytics))
+            await self.db.commit()
+        except Exception as e:
+            await self.db.rollback()
+            print(f"Bulk import batch failed: {str(e)}")
+            for row, _, _ in batch:
+                self.reject(row, "Database insert failed")
+            return
+
+        self.created.extend({'row': row, 'business_id': business_id} for row, business_id, _ in batch)
+
+
+async def import_businesses(
+    db: AsyncSession,
+    chunks: AsyncIterator[bytes],
+    content_type: str,
+    max_rows: Optional[int] = None
+) -> dict:
+    lines = iter_lines(chunks)
+    if content_type in CSV_TYPES:
+        records = iter_csv_records(lines)
+    else:
+        records = iter_ndjson_records(lines)
+
+    max_rows = max_rows or settings.bulk_import_max_rows
+    importer = BulkImporter(db, settings.bulk_import_batch_size)
+    async for row, record in records:
+        if row > max_rows:
+            importer.reject(row, f"Import is limited to {max_rows} rows; remaining rows were skipped")
+            break
+        if isinstance(record, Exception):
+            importer.reject(row, str(record))
+            continue
+        await importer.add(row, record)
+    await importer.flush()
+
+    importer.errors.sort(key=lambda e: e['row'])
+    return {
+        'created': importer.created,
+        'errors': importer.errors
+    }
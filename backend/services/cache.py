@@ -0,0 +1,202 @@
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+from uuid import UUID
+
+from config import Lazy, settings
+
+
+# Every backend counts deletes in a generation number. A reader takes the
+# generation before loading from the database and passes it to set(), which
+# skips the write if a delete ran in between, so an entry loaded before an
+# edit is never cached after the edit's invalidation.
+class MemoryCache:
+    def __init__(self, max_entries: int, ttl: int):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generation = 0
+
+    async def generation(self) -> int:
+        return self._generation
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: dict, generation: int):
+        if generation != self._generation:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str):
+        self._generation += 1
+        for key in keys:
+            self._entries.pop(key, None)
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisCache:
+    def __init__(self, url: str, ttl: int, prefix: str = "holidyhours:", client=None):
+        try:
+            from redis import asyncio as redis
+            from redis.exceptions import WatchError
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        if client is None:
+            client = redis.from_url(url)
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+        self.generation_key = prefix + "generation"
+        self._watch_error = WatchError
+
+    async def generation(self) -> int:
+        return int(await self.client.get(self.generation_key) or 0)
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            return None
+        return json.loads(raw)
+
+    async def set(self, key: str, value: dict, generation: int):
+        # WATCH aborts the write if another worker deletes in the meantime
+        async with self.client.pipeline(transaction=True) as pipe:
+            await pipe.watch(self.generation_key)
+            if int(await pipe.get(self.generation_key) or 0) != generation:
+                return
+            pipe.multi()
+            pipe.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+            try:
+                await pipe.execute()
+            except self._watch_error:
+                pass
+
+    async def delete(self, *keys: str):
+        if keys:
+            async with self.client.pipeline(transaction=True) as pipe:
+                pipe.incr(self.generation_key)
+                pipe.delete(*[self.prefix + key for key in keys])
+                await pipe.execute()
+
+    async def close(self):
+        await self.client.aclose()
+
+
+class NullCache:
+    async def generation(self) -> int:
+        return 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        return None
+
+    async def set(self, key: str, value: dict, generation: int):
+        pass
+
+    async def delete(self, *keys: str):
+        pass
+
+    async def close(self):
+        pass
+
+
+class PageCache:
+    def __init__(self, backend, revalidate: bool = False):
+        self.backend = backend
+        # Callers check hits against the database's updated_at before serving them
+        self.revalidate = revalidate
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def page_key(page_id: UUID) -> str:
+        return f"page:{page_id}"
+
+    @staticmethod
+    def business_key(business_id: UUID) -> str:
+        return f"page:business:{business_id}"
+
+    @staticmethod
+    def template_key(template_id: str) -> str:
+        return f"template:{template_id}"
+
+    async def get(self, key: str) -> Optional[dict]:
+        try:
+            payload = await self.backend.get(key)
+        except Exception as e:
+            print(f"Page cache read failed: {str(e)}")
+            payload = None
+
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return payload
+
+    async def generation(self) -> Optional[int]:
+        # Take this before loading what will be passed to set()
+        try:
+            return await self.backend.generation()
+        except Exception as e:
+            print(f"Page cache read failed: {str(e)}")
+            return None
+
+    async def set(self, key: str, payload: dict, generation: Optional[int]):
+        if generation is None:
+            return
+        try:
+            await self.backend.set(key, payload, generation)
+        except Exception as e:
+            print(f"Page cache write failed: {str(e)}")
+
+    # The database write has committed by the time these run, so a failure is
+    # logged rather than failing the request; entries then expire after cache_ttl
+    async def invalidate(self, page_id: UUID, business_id: UUID):
+        try:
+            await self.backend.delete(self.page_key(page_id), self.business_key(business_id))
+        except Exception as e:
+            print(f"Page cache invalidation failed: {str(e)}")
+
+    async def invalidate_template(self, template_id: str):
+        try:
+            await self.backend.delete(self.template_key(template_id))
+        except Exception as e:
+            print(f"Page cache invalidation failed: {str(e)}")
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    async def close(self):
+        await self.backend.close()
+
+
+def create_cache_backend():
+    if settings.cache_backend == "redis":
+        return RedisCache(settings.cache_url, settings.cache_ttl)
+    if settings.cache_backend == "none":
+        return NullCache()
+    return MemoryCache(settings.cache_max_entries, settings.cache_ttl)
+
+
+page_cache = Lazy(
+    lambda: PageCache(create_cache_backend(), settings.cache_revalidate),
+    close=lambda built: built.close()
+)
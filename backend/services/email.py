@@ -1,212 +1,246 @@
+from abc import ABC, abstractmethod
+import queue
 import smtplib
+import threading
+import time
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from datetime import datetime
-import resend
-from config import settings
+from typing import Callable
+from config import Lazy, settings
+from services import email_templates
+from services.metrics import time_external
 
 
-resend.api_key = settings.resend_api_key
+class EmailQueueFull(Exception):
+    pass
 
 
-class EmailService:
-    def __init__(self):
-        self.from_email = settings.from_email
+class ResendTransport:
+    name = "resend"
 
-    def send_magic_link(self, to_email: str, magic_link: str, business_name: str):
+    def __init__(self):
+        # Imported here so the SMTP setup does not pay for the resend SDK
+        import resend
+        resend.api_key = settings.resend_api_key
+        self.client = resend
+
+    def send(self, message: dict):
+        self.client.Emails.send(message)
+
+    def close(self):
+        pass
+
+
+# Keeps one authenticated SMTP session open across sends; it is dropped after any
+# error and reopened on the next send.
+class SMTPTransport:
+    name = "smtp"
+
+    def __init__(self, host: str, port: int, user: str, password: str, starttls: bool, timeout: float):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self._server = None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
         try:
-            resend.Emails.send({
-                "from": self.from_email,
-                "to": to_email,
-                "subject": f"Edit Your {business_name} Holiday Hours - HolidyHours",
-                "html": f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                        <h1 style="color: #2563eb;">HolidyHours</h1>
-                        <h2>Edit Your Holiday Hours</h2>
-                        <p>Hello,</p>
-                        <p>Click the link below to edit your holiday hours page for <strong>{business_name}</strong>:</p>
-                        <p style="margin: 30px 0;">
-                            <a href="{magic_link}"
-                               style="background-color: #2563eb; color: white; padding: 12px 24px;
-                                      text-decoration: none; border-radius: 6px; display: inline-block;">
-                                Edit My Page
-                            </a>
-                        </p>
-                        <p style="color: #666; font-size: 14px;">
-                            This link will expire in 24 hours for security reasons.
-                        </p>
-                        <p style="color: #666; font-size: 14px;">
-                            If you didn't request this link, you can safely ignore this email.
-                        </p>
-                        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-                        <p style="color: #999; font-size: 12px;">
-                            HolidyHours - Making holiday hours simple<br>
-                            Questions? Reply to this email or contact support@holidyhours.com
-                        </p>
-                    </div>
-                </body>
-                </html>
-                """
-            })
-        except Exception as e:
-            print(f"Failed to send magic link email: {str(e)}")
+            if self.starttls:
+                server.starttls()
+            if self.user:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
             raise
+        self._server = server
 
-    def send_payment_receipt(self, to_email: str, business_name: str, amount: float, reference: str, page_url: str):
+    def send(self, message):
+        if self._server is None:
+            self._connect()
         try:
-            resend.Emails.send({
-                "from": self.from_email,
-                "to": to_email,
-                "subject": "Payment Confirmed - Your Holiday Hours Page is Live!",
-                "html": f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                        <h1 style="color: #2563eb;">HolidyHours</h1>
-                        <h2>Payment Confirmed!</h2>
-                        <p>Hello,</p>
-                        <p>Thank you for your payment. Your holiday hours page for <strong>{business_name}</strong> is now live!</p>
-
-                        <div style="background-color: #f3f4f6; padding: 20px; border-radius: 6px; margin: 20px 0;">
-                            <h3 style="margin-top: 0;">Payment Details</h3>
-                            <p style="margin: 5px 0;"><strong>Amount:</strong> ${amount:.2f}</p>
-                            <p style="margin: 5px 0;"><strong>Reference:</strong> {reference}</p>
-                            <p style="margin: 5px 0;"><strong>Date:</strong> {datetime.now().strftime('%B %d, %Y')}</p>
-                        </div>
-
-                        <p style="margin: 30px 0;">
-                            <a href="{page_url}"
-                               style="background-color: #2563eb; color: white; padding: 12px 24px;
-                                      text-decoration: none; border-radius: 6px; display: inline-block;">
-                                View Your Page
-                            </a>
-                        </p>
-
-                        <p>You can edit your page anytime using the magic link we'll send to your email.</p>
-
-                        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-                        <p style="color: #999; font-size: 12px;">
-                            HolidyHours - Making holiday hours simple<br>
-                            Questions? Reply to this email or contact support@holidyhours.com
-                        </p>
-                    </div>
-                </body>
-                </html>
-                """
-            })
-        except Exception as e:
-            print(f"Failed to send receipt email: {str(e)}")
+            self._server.send_message(message)
+        except Exception:
+            self.close()
             raise
 
-class SMTPEmailService:
+    def close(self):
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            self._server.close()
+        self._server = None
+
+
+# Bounded queue drained by worker threads, each with its own transport. Failed
+# sends are retried with exponential backoff.
+class EmailQueue:
+    def __init__(
+        self,
+        transport_factory: Callable,
+        maxsize: int,
+        workers: int,
+        max_retries: int,
+        retry_backoff: float
+    ):
+        self.transport_factory = transport_factory
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+
+    def enqueue(self, message, description: str):
+        try:
+            self._queue.put_nowait((message, description))
+        except queue.Full:
+            raise EmailQueueFull("Email queue is full")
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _deliver(self, transport, message, description: str):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with time_external(transport.name, "send"):
+                    transport.send(message)
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    print(f"Failed to send {description} after {attempt + 1} attempts: {str(e)}")
+                    return
+                time.sleep(self.retry_backoff * (2 ** attempt))
+
+    def _run(self):
+        transport = self.transport_factory()
+        try:
+            while True:
+                item = self._queue.get()
+                try:
+                    if item is None:
+                        return
+                    self._deliver(transport, *item)
+                finally:
+                    self._queue.task_done()
+        finally:
+            transport.close()
+
+    def start(self):
+        if self._threads:
+            return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"email-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float):
+        # Workers finish what is already queued before picking up their sentinel
+        deadline = time.monotonic() + timeout
+        for _ in self._threads:
+            try:
+                self._queue.put(None, timeout=max(deadline - time.monotonic(), 0))
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        self._threads = []
+
+
+def create_email_queue(transport_factory: Callable) -> EmailQueue:
+    return EmailQueue(
+        transport_factory,
+        maxsize=settings.email_queue_size,
+        workers=settings.email_workers,
+        max_retries=settings.email_max_retries,
+        retry_backoff=settings.email_retry_backoff
+    )
+
+
+# Renders the shared templates; subclasses turn them into messages for their
+# transport in _send
+class BaseEmailService(ABC):
+    queue: EmailQueue
+
+    def start(self):
+        self.queue.start()
+
+    def stop(self):
+        self.queue.stop(settings.email_shutdown_timeout)
+
+    @abstractmethod
+    def _send(self, to_email: str, rendered: email_templates.RenderedEmail, description: str):
+        pass
+
+    def send_magic_link(self, to_email: str, magic_link: str, business_name: str):
+        rendered = email_templates.render(
+            'magic_link',
+            business_name=business_name,
+            magic_link=magic_link
+        )
+        self._send(to_email, rendered, "magic link email")
+
+    def send_payment_receipt(self, to_email: str, business_name: str, amount: float, reference: str, page_url: str):
+        rendered = email_templates.render(
+            'payment_receipt',
+            business_name=business_name,
+            amount=amount,
+            reference=reference,
+            page_url=page_url,
+            date=datetime.now().strftime('%B %d, %Y')
+        )
+        self._send(to_email, rendered, "receipt email")
+
+
+class EmailService(BaseEmailService):
+    def __init__(self):
+        self.from_email = settings.from_email
+        self.queue = create_email_queue(ResendTransport)
+
+    def _send(self, to_email: str, rendered: email_templates.RenderedEmail, description: str):
+        self.queue.enqueue({
+            "from": self.from_email,
+            "to": to_email,
+            "subject": rendered.subject,
+            "html": rendered.html,
+            "text": rendered.text
+        }, description)
+
+
+class SMTPEmailService(BaseEmailService):
     def __init__(self):
         self.from_email = settings.from_email
         self.smtp_host = settings.smtp_host
         self.smtp_port = settings.smtp_port
         self.smtp_user = settings.smtp_user
         self.smtp_password = settings.smtp_password
-
-    def send_magic_link(self, to_email: str, magic_link: str, business_name: str):
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = f"Edit Your {business_name} Holiday Hours - HolidyHours"
-
-            html = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h1 style="color: #2563eb;">HolidyHours</h1>
-                    <h2>Edit Your Holiday Hours</h2>
-                    <p>Hello,</p>
-                    <p>Click the link below to edit your holiday hours page for <strong>{business_name}</strong>:</p>
-                    <p style="margin: 30px 0;">
-                        <a href="{magic_link}"
-                           style="background-color: #2563eb; color: white; padding: 12px 24px;
-                                  text-decoration: none; border-radius: 6px; display: inline-block;">
-                            Edit My Page
-                        </a>
-                    </p>
-                    <p style="color: #666; font-size: 14px;">
-                        This link will expire in 24 hours for security reasons.
-                    </p>
-                    <p style="color: #666; font-size: 14px;">
-                        If you didn't request this link, you can safely ignore this email.
-                    </p>
-                    <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-                    <p style="color: #999; font-size: 12px;">
-                        HolidyHours - Making holiday hours simple<br>
-                        Questions? Reply to this email or contact support@holidyhours.com
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            msg.attach(MIMEText(html, 'html'))
-
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-        except Exception as e:
-            print(f"Failed to send magic link email via SMTP: {str(e)}")
-            raise
-
-    def send_payment_receipt(self, to_email: str, business_name: str, amount: float, reference: str, page_url: str):
-        try:
-            msg = MIMEMultipart()
-            msg['From'] = self.from_email
-            msg['To'] = to_email
-            msg['Subject'] = "Payment Confirmed - Your Holiday Hours Page is Live!"
-
-            html = f"""
-            <html>
-            <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
-                    <h1 style="color: #2563eb;">HolidyHours</h1>
-                    <h2>Payment Confirmed!</h2>
-                    <p>Hello,</p>
-                    <p>Thank you for your payment. Your holiday hours page for <strong>{business_name}</strong> is now live!</p>
-
-                    <div style="background-color: #f3f4f6; padding: 20px; border-radius: 6px; margin: 20px 0;">
-                        <h3 style="margin-top: 0;">Payment Details</h3>
-                        <p style="margin: 5px 0;"><strong>Amount:</strong> ${amount:.2f}</p>
-                        <p style="margin: 5px 0;"><strong>Reference:</strong> {reference}</p>
-                        <p style="margin: 5px 0;"><strong>Date:</strong> {datetime.now().strftime('%B %d, %Y')}</p>
-                    </div>
-
-                    <p style="margin: 30px 0;">
-                        <a href="{page_url}"
-                           style="background-color: #2563eb; color: white; padding: 12px 24px;
-                                  text-decoration: none; border-radius: 6px; display: inline-block;">
-                            View Your Page
-                        </a>
-                    </p>
-
-                    <p>You can edit your page anytime using the magic link we'll send to your email.</p>
-
-                    <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
-                    <p style="color: #999; font-size: 12px;">
-                        HolidyHours - Making holiday hours simple<br>
-                        Questions? Reply to this email or contact support@holidyhours.com
-                    </p>
-                </div>
-            </body>
-            </html>
-            """
-            msg.attach(MIMEText(html, 'html'))
-
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls()
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-        except Exception as e:
-            print(f"Failed to send receipt email via SMTP: {str(e)}")
-            raise
-
-# email_service = EmailService()
+        self.queue = create_email_queue(self._create_transport)
+
+    def _create_transport(self) -> SMTPTransport:
+        return SMTPTransport(
+            self.smtp_host,
+            self.smtp_port,
+            self.smtp_user,
+            self.smtp_password,
+            starttls=settings.smtp_starttls,
+            timeout=settings.smtp_timeout
+        )
+
+    def _send(self, to_email: str, rendered: email_templates.RenderedEmail, description: str):
+        msg = MIMEMultipart('alternative')
+        msg['From'] = self.from_email
+        msg['To'] = to_email
+        msg['Subject'] = rendered.subject
+        msg.attach(MIMEText(rendered.text, 'plain'))
+        msg.attach(MIMEText(rendered.html, 'html'))
+
+        self.queue.enqueue(msg, description)
+
+
+# email_service = Lazy(EmailService, close=lambda built: built.stop())
 # To use SMTP service, uncomment the line below and comment the line above
-email_service = SMTPEmailService()
+email_service = Lazy(SMTPEmailService, close=lambda built: built.stop())
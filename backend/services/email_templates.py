@@ -0,0 +1,149 @@
+import html
+from string import Formatter
+from typing import NamedTuple
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    html: str
+    text: str
+
+
+# Splits a str.format-style template into (literal, field, format_spec) parts once,
+# so rendering only formats the fields and joins the pieces.
+def _compile(template: str) -> list:
+    return [
+        (literal, field, spec or '')
+        for literal, field, spec, _ in Formatter().parse(template)
+    ]
+
+
+def _render(parts: list, fields: dict, escape: bool) -> str:
+    pieces = []
+    for literal, field, spec in parts:
+        pieces.append(literal)
+        if field is not None:
+            value = format(fields[field], spec)
+            pieces.append(html.escape(value) if escape else value)
+    return ''.join(pieces)
+
+
+class EmailTemplate:
+    def __init__(self, subject: str, html_body: str, text_body: str):
+        self._subject = _compile(subject)
+        self._html = _compile(HTML_LAYOUT.replace('{{body}}', html_body))
+        self._text = _compile(text_body + TEXT_FOOTER)
+
+    def render(self, **fields) -> RenderedEmail:
+        return RenderedEmail(
+            subject=_render(self._subject, fields, escape=False),
+            html=_render(self._html, fields, escape=True),
+            text=_render(self._text, fields, escape=False)
+        )
+
+
+HTML_LAYOUT = """
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h1 style="color: #2563eb;">HolidyHours</h1>
+{{body}}
+        <hr style="border: none; border-top: 1px solid #ddd; margin: 30px 0;">
+        <p style="color: #999; font-size: 12px;">
+            HolidyHours - Making holiday hours simple<br>
+            Questions? Reply to this email or contact support@holidyhours.com
+        </p>
+    </div>
+</body>
+</html>
+"""
+
+TEXT_FOOTER = """
+--
+HolidyHours - Making holiday hours simple
+Questions? Reply to this email or contact support@holidyhours.com
+"""
+
+BUTTON_STYLE = (
+    "background-color: #2563eb; color: white; padding: 12px 24px; "
+    "text-decoration: none; border-radius: 6px; display: inline-block;"
+)
+
+MAGIC_LINK = EmailTemplate(
+    subject="Edit Your {business_name} Holiday Hours - HolidyHours",
+    html_body="""
+        <h2>Edit Your Holiday Hours</h2>
+        <p>Hello,</p>
+        <p>Click the link below to edit your holiday hours page for <strong>{business_name}</strong>:</p>
+        <p style="margin: 30px 0;">
+            <a href="{magic_link}" style="%s">
+                Edit My Page
+            </a>
+        </p>
+        <p style="color: #666; font-size: 14px;">
+            This link will expire in 24 hours for security reasons.
+        </p>
+        <p style="color: #666; font-size: 14px;">
+            If you didn't request this link, you can safely ignore this email.
+        </p>
+""" % BUTTON_STYLE,
+    text_body="""Edit Your Holiday Hours
+
+Hello,
+
+Open the link below to edit your holiday hours page for {business_name}:
+
+{magic_link}
+
+This link will expire in 24 hours for security reasons.
+If you didn't request this link, you can safely ignore this email.
+"""
+)
+
+PAYMENT_RECEIPT = EmailTemplate(
+    subject="Payment Confirmed - Your Holiday Hours Page is Live!",
+    html_body="""
+        <h2>Payment Confirmed!</h2>
+        <p>Hello,</p>
+        <p>Thank you for your payment. Your holiday hours page for <strong>{business_name}</strong> is now live!</p>
+
+        <div style="background-color: #f3f4f6; padding: 20px; border-radius: 6px; margin: 20px 0;">
+            <h3 style="margin-top: 0;">Payment Details</h3>
+            <p style="margin: 5px 0;"><strong>Amount:</strong> ${amount:.2f}</p>
+            <p style="margin: 5px 0;"><strong>Reference:</strong> {reference}</p>
+            <p style="margin: 5px 0;"><strong>Date:</strong> {date}</p>
+        </div>
+
+        <p style="margin: 30px 0;">
+            <a href="{page_url}" style="%s">
+                View Your Page
+            </a>
+        </p>
+
+        <p>You can edit your page anytime using the magic link we'll send to your email.</p>
+""" % BUTTON_STYLE,
+    text_body="""Payment Confirmed!
+
+Hello,
+
+Thank you for your payment. Your holiday hours page for {business_name} is now live!
+
+Payment Details
+Amount: ${amount:.2f}
+Reference: {reference}
+Date: {date}
+
+View your page: {page_url}
+
+You can edit your page anytime using the magic link we'll send to your email.
+"""
+)
+
+templates = {
+    'magic_link': MAGIC_LINK,
+    'payment_receipt': PAYMENT_RECEIPT,
+}
+
+
+def render(name: str, **fields) -> RenderedEmail:
+    return templates[name].render(**fields)
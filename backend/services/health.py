@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from sqlalchemy import text
+
+from config import Lazy, settings
+from database import async_engine
+from services.email import email_service
+
+
+async def check_database() -> dict:
+    # Exercises a real pool checkout, so a wedged pool fails the check too
+    start = time.perf_counter()
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return {"ok": True, "latency_seconds": round(time.perf_counter() - start, 6)}
+
+
+def check_pool() -> dict:
+    pool = async_engine.pool
+    capacity = pool.size() + settings.db_max_overflow
+    saturation = pool.checkedout() / capacity if capacity else 0.0
+    return {
+        "ok": saturation < settings.ready_max_pool_saturation,
+        "checked_out": pool.checkedout(),
+        "capacity": capacity,
+        "saturation": round(saturation, 3),
+    }
+
+
+def check_email_queue() -> dict:
+    queue = getattr(email_service, "queue", None)
+    if queue is None:
+        return {"ok": True}
+    depth = queue.depth()
+    fill = depth / settings.email_queue_size if settings.email_queue_size else 0.0
+    return {
+        "ok": fill < settings.ready_max_email_queue_fill,
+        "depth": depth,
+        "capacity": settings.email_queue_size,
+    }
+
+
+class ReadinessProbe:
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._result = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _run_checks(self) -> dict:
+        try:
+            database = await asyncio.wait_for(check_database(), settings.ready_db_timeout)
+        except asyncio.TimeoutError:
+            database = {"ok": False, "error": f"timed out after {settings.ready_db_timeout}s"}
+        except Exception as e:
+            # /ready is unauthenticated; the driver's message can name hosts and users
+            print(f"Readiness database check failed: {str(e)}")
+            database = {"ok": False, "error": "unreachable"}
+
+        checks = {
+            "database": database,
+            "pool": check_pool(),
+            "email_queue": check_email_queue(),
+        }
+        return {
+            "status": "ready" if all(check["ok"] for check in checks.values()) else "unavailable",
+            "checks": checks,
+        }
+
+    async def check(self) -> dict:
+        if self._result is not None and time.monotonic() - self._checked_at < self.ttl:
+            return self._result
+        # Probes arriving while a check runs wait for it instead of starting their own
+        async with self._lock:
+            if self._result is None or time.monotonic() - self._checked_at >= self.ttl:
+                self._result = await self._run_checks()
+                self._checked_at = time.monotonic()
+        return self._result
+
+
+readiness_probe = Lazy(lambda: ReadinessProbe(settings.ready_cache_ttl))
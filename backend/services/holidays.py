@@ -0,0 +1,78 @@
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, update, func, text, bindparam
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models import Page
+
+# Rebuilds pages.holidays inside Postgres: existing entries keep their position and
+# are replaced when an upsert has the same (name, date), removed keys are dropped,
+# and upserts matching nothing are appended in request order.
+MERGED_HOLIDAYS = text("""(
+    SELECT coalesce(jsonb_agg(merged.elem ORDER BY merged.ord), '[]'::jsonb)
+    FROM (
+        SELECT coalesce(u.elem, h.elem) AS elem, h.ord
+        FROM jsonb_array_elements(pages.holidays) WITH ORDINALITY AS h(elem, ord)
+        LEFT JOIN jsonb_array_elements(:upserts) AS u(elem)
+            ON u.elem->>'name' = h.elem->>'name' AND u.elem->>'date' = h.elem->>'date'
+        WHERE NOT EXISTS (
+            SELECT 1 FROM jsonb_array_elements(:removes) AS r(elem)
+            WHERE r.elem->>'name' = h.elem->>'name' AND r.elem->>'date' = h.elem->>'date'
+        )
+        UNION ALL
+        SELECT u.elem, jsonb_array_length(pages.holidays) + u.ord
+        FROM jsonb_array_elements(:upserts) WITH ORDINALITY AS u(elem, ord)
+        WHERE NOT EXISTS (
+            SELECT 1 FROM jsonb_array_elements(pages.holidays) AS h(elem)
+            WHERE u.elem->>'name' = h.elem->>'name' AND u.elem->>'date' = h.elem->>'date'
+        )
+    ) AS merged
+)""").bindparams(
+    bindparam('upserts', type_=JSONB),
+    bindparam('removes', type_=JSONB)
+)
+
+
+def apply_patch(holidays: list, upserts: list, removes: list) -> list:
+    # Same edit as MERGED_HOLIDAYS, for holidays merged in Python
+    upserts_by_key = {(holiday['name'], holiday['date']): holiday for holiday in upserts}
+    removed = {(holiday['name'], holiday['date']) for holiday in removes}
+    patched = []
+    for holiday in holidays:
+        key = (holiday['name'], holiday['date'])
+        if key in removed:
+            continue
+        patched.append(upserts_by_key.pop(key, holiday))
+    patched.extend(upserts_by_key.values())
+    return patched
+
+
+async def patch_holidays(
+    db: AsyncSession,
+    page_id: UUID,
+    upserts: list,
+    removes: list,
+    expected_updated_at: Optional[datetime] = None
+) -> Optional[Page]:
+    # Applies the edit in one UPDATE, so concurrent patches of different holidays
+    # never overwrite each other. Returns None when the page is missing or, with
+    # expected_updated_at, was changed since the client read it. The caller commits.
+    stmt = (
+        update(Page)
+        .where(Page.id == page_id)
+        .values(
+            holidays=MERGED_HOLIDAYS.bindparams(upserts=upserts, removes=removes),
+            updated_at=func.now()
+        )
+        .returning(Page)
+    )
+    if expected_updated_at is not None:
+        stmt = stmt.where(Page.updated_at == expected_updated_at)
+    return await db.scalar(stmt, execution_options={'populate_existing': True})
+
+
+async def page_exists(db: AsyncSession, page_id: UUID) -> bool:
+    return await db.scalar(select(Page.id).where(Page.id == page_id)) is not None
@@ -0,0 +1,55 @@
+from datetime import datetime, timezone, timedelta
+from email.utils import format_datetime, parsedate_to_datetime
+from uuid import UUID
+
+from fastapi import Request, Response, status
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Let browsers and CDNs store responses but revalidate them on every use
+CACHE_CONTROL = "public, no-cache"
+
+
+def make_etag(resource_id: UUID, modified: datetime) -> str:
+    micros = (modified - EPOCH) // timedelta(microseconds=1)
+    return f'"{resource_id.hex}-{micros:x}"'
+
+
+def validator_headers(resource_id: UUID, modified: datetime) -> dict:
+    return {
+        "ETag": make_etag(resource_id, modified),
+        "Last-Modified": format_datetime(modified.astimezone(timezone.utc), usegmt=True),
+        "Cache-Control": CACHE_CONTROL,
+    }
+
+
+def has_conditions(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, headers: dict, modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match takes precedence and uses weak comparison (RFC 9110 13.1.2)
+        etag = headers["ETag"]
+        for candidate in if_none_match.split(","):
+            candidate = candidate.strip()
+            if candidate == "*" or candidate.removeprefix("W/") == etag:
+                return True
+        return False
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def not_modified_response(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
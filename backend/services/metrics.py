@@ -0,0 +1,264 @@
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    disable_created_metrics,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+
+# With PROMETHEUS_MULTIPROC_DIR set before this module is imported (server.py
+# does so when it runs several workers), prometheus_client keeps every value
+# in per-process files in that directory and /metrics adds them all up.
+# Counters and histograms of exited workers stay in their files, so totals
+# never go backwards; gauges only count live workers.
+
+# Only *_total, *_bucket, *_sum and *_count series, without *_created
+disable_created_metrics()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+registry = CollectorRegistry()
+
+http_requests = Counter(
+    'http_requests', 'HTTP requests handled', ('method', 'route', 'status'), registry=registry
+)
+http_request_duration = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'route'),
+    buckets=LATENCY_BUCKETS, registry=registry
+)
+http_in_flight = Gauge(
+    'http_requests_in_flight', 'HTTP requests currently being handled',
+    multiprocess_mode='livesum', registry=registry
+)
+db_statements_per_request = Histogram(
+    'http_request_db_statements', 'SQL statements issued per HTTP request', ('method', 'route'),
+    buckets=COUNT_BUCKETS, registry=registry
+)
+db_seconds_per_request = Histogram(
+    'http_request_db_seconds', 'Time spent executing SQL per HTTP request', ('method', 'route'),
+    buckets=LATENCY_BUCKETS, registry=registry
+)
+db_statements = Counter(
+    'db_statements', 'SQL statements executed, including background work', registry=registry
+)
+external_call_duration = Histogram(
+    'external_call_duration_seconds', 'Outbound calls to third-party services',
+    ('service', 'operation', 'outcome'), buckets=LATENCY_BUCKETS, registry=registry
+)
+db_pool_connections = Gauge(
+    'db_pool_connections', 'Connections per pool and state', ('pool', 'state'),
+    multiprocess_mode='livesum', registry=registry
+)
+db_pool_checkout_wait = Counter(
+    'db_pool_checkout_wait_seconds', 'Time spent waiting for pool checkouts', ('pool',), registry=registry
+)
+db_pool_timeouts = Counter(
+    'db_pool_timeouts', 'Pool checkouts that timed out', ('pool',), registry=registry
+)
+cache_lookups = Counter(
+    'page_cache_lookups', 'Page cache lookups by result', ('result',), registry=registry
+)
+queue_depth = Gauge(
+    'queue_depth', 'Items waiting in background queues and buffers', ('queue',),
+    multiprocess_mode='livesum', registry=registry
+)
+
+
+def multiprocess_dir() -> Optional[str]:
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+# Collectors copy other services' state (pool sizes, queue depths, running
+# totals) into metrics, so those services need no metrics calls of their own
+_collectors = []
+_totals = {}
+
+
+def add_collector(collector: Callable):
+    _collectors.append(collector)
+
+
+def run_collectors():
+    for collector in _collectors:
+        try:
+            collector()
+        except Exception as e:
+            print(f"Metrics collector failed: {str(e)}")
+
+
+def count_total(counter: Counter, total: float, *labels):
+    # Advances a counter to a running total another service keeps. A total
+    # that went down belongs to a rebuilt service and counts from there.
+    key = (counter, labels)
+    last = _totals.get(key, 0)
+    if total > last:
+        counter.labels(*labels).inc(total - last)
+    _totals[key] = total
+
+
+def render() -> bytes:
+    run_collectors()
+    if multiprocess_dir():
+        combined = CollectorRegistry()
+        multiprocess.MultiProcessCollector(combined)
+        return generate_latest(combined)
+    return generate_latest(registry)
+
+
+class PeriodicCollection:
+    # /metrics only runs the collectors of the worker answering it, so with
+    # several workers each one refreshes its own values on a timer
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            run_collectors()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        run_collectors()
+
+
+class RequestStats:
+    __slots__ = ('statements', 'db_seconds')
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+
+# Set per request by MetricsMiddleware; SQL run by background tasks or workers
+# outside a request only counts towards db_statements_total
+current_request: ContextVar[Optional[RequestStats]] = ContextVar('current_request', default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start'].pop()
+    db_statements.inc()
+    stats = current_request.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.db_seconds += elapsed
+
+
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get('query_start') if exception_context.connection else None
+    if starts:
+        starts.pop()
+
+
+def instrument_engine(engine):
+    # Takes a sync Engine; pass AsyncEngine.sync_engine for the async one
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(engine, 'handle_error', _handle_error)
+
+
+class ExternalCall:
+    __slots__ = ('outcome',)
+
+    def __init__(self):
+        self.outcome = None
+
+
+@contextmanager
+def time_external(service: str, operation: str):
+    # Callers may set call.outcome (e.g. to the HTTP status); otherwise it is
+    # 'ok', or 'error' when the block raises
+    call = ExternalCall()
+    start = time.perf_counter()
+    try:
+        yield call
+    except BaseException:
+        call.outcome = call.outcome or 'error'
+        raise
+    finally:
+        external_call_duration.labels(service, operation, call.outcome or 'ok').observe(time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    # Plain ASGI middleware: records after the response is sent, without wrapping
+    # the request or response bodies
+    def __init__(self, app):
+        self.app = app
+        self._routes = None
+
+    def _route_label(self, scope) -> str:
+        # Label by the route template (/api/pages/{page_id}), not the raw path,
+        # so ids do not create a new series per page
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        if self._routes is None:
+            self._routes = {}
+            for route in scope['app'].routes:
+                target = getattr(route, 'endpoint', None) or getattr(route, 'app', None)
+                if target is not None:
+                    self._routes[target] = route.path
+        return self._routes.get(endpoint, 'unmatched')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status_code = 500
+        finished = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, finished
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                # Background tasks run after this, so stop the clock and freeze the
+                # SQL counts here to keep their work out of the request's numbers
+                finished = (time.perf_counter(), stats.statements, stats.db_seconds)
+            await send(message)
+
+        http_in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if finished is None:
+                finished = (time.perf_counter(), stats.statements, stats.db_seconds)
+            end, statements, db_seconds = finished
+            http_in_flight.dec()
+            current_request.reset(token)
+            method = scope['method']
+            route = self._route_label(scope)
+            http_requests.labels(method, route, str(status_code)).inc()
+            http_request_duration.labels(method, route).observe(end - start)
+            db_statements_per_request.labels(method, route).observe(statements)
+            db_seconds_per_request.labels(method, route).observe(db_seconds)
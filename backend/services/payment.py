@@ -1,15 +1,70 @@
-import httpx
-from config import settings
+import asyncio
+from typing import TYPE_CHECKING
+
+from config import Lazy, settings
+from services.metrics import time_external
+
+if TYPE_CHECKING:
+    import httpx
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
 
 
 class PaymentService:
-    def __init__(self, secret_key: str):
+    def __init__(self, secret_key: str, base_url: str = "https://api.paystack.co", transport=None):
         self.secret_key = secret_key
-        self.base_url = "https://api.paystack.co"
+        self.base_url = base_url
         self.headers = {
             "Authorization": f"Bearer {self.secret_key}",
             "Content-Type": "application/json",
         }
+        # Lets tests and benchmarks route requests to a mock Paystack
+        self.transport = transport
+        self._client = None
+        self._inflight = {}
+
+    def _create_client(self) -> "httpx.AsyncClient":
+        # httpx (and httpcore under it) is slow to import and only needed once a
+        # payment call is made, so it stays out of app start-up
+        import httpx
+
+        http2 = settings.paystack_http2 and _http2_available()
+        if settings.paystack_http2 and not http2:
+            print("HTTP/2 requested for Paystack but the h2 package is not installed, using HTTP/1.1")
+
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=http2,
+            transport=self.transport,
+            limits=httpx.Limits(
+                max_connections=settings.paystack_max_connections,
+                max_keepalive_connections=settings.paystack_max_keepalive_connections,
+                keepalive_expiry=settings.paystack_keepalive_expiry
+            ),
+            timeout=httpx.Timeout(
+                settings.paystack_timeout,
+                connect=settings.paystack_connect_timeout
+            )
+        )
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        # Created on the first payment call and closed by the app lifespan
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     async def initialize_payment(self, email: str, amount: int, business_id: str, callback_url: str):
         # Paystack expects amount in kobo (lowest currency unit)
@@ -25,17 +80,44 @@ class PaymentService:
                 ]
             }
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(f"{self.base_url}/transaction/initialize", headers=self.headers, json=payload)
-            response.raise_for_status()  # Will raise an exception for 4xx/5xx responses
-            return response.json()['data']
+        with time_external("paystack", "initialize") as call:
+            response = await self.client.post("/transaction/initialize", json=payload)
+            call.outcome = str(response.status_code)
+        response.raise_for_status()  # Will raise an exception for 4xx/5xx responses
+        return response.json()['data']
 
     async def verify_payment(self, reference: str):
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{self.base_url}/transaction/verify/{reference}", headers=self.headers)
-            response.raise_for_status()
-            return response.json()['data']
+        import httpx
+
+        # Verification is a read, so transport errors and 5xx/429 responses are retried
+        for attempt in range(settings.paystack_max_retries + 1):
+            last_attempt = attempt == settings.paystack_max_retries
+            try:
+                with time_external("paystack", "verify") as call:
+                    response = await self.client.get(f"/transaction/verify/{reference}")
+                    call.outcome = str(response.status_code)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or (response.status_code < 500 and response.status_code != 429):
+                    response.raise_for_status()
+                    return response.json()['data']
+            await asyncio.sleep(settings.paystack_retry_backoff * (2 ** attempt))
+
+    async def verify_payment_coalesced(self, reference: str):
+        # Concurrent verifies of one reference share a single upstream call
+        task = self._inflight.get(reference)
+        if task is None:
+            task = asyncio.ensure_future(self.verify_payment(reference))
+            self._inflight[reference] = task
+            task.add_done_callback(lambda _: self._inflight.pop(reference, None))
+        # Shielded so one caller disconnecting does not cancel it for the others
+        return await asyncio.shield(task)
 
 
 # Instantiate the service with the key from settings
-payment_service = PaymentService(secret_key=settings.paystack_secret_key)
\ No newline at end of file
+payment_service = Lazy(
+    lambda: PaymentService(secret_key=settings.paystack_secret_key),
+    close=lambda built: built.close()
+)
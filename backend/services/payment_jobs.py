@@ -0,0 +1,247 @@
+import asyncio
+import hashlib
+import hmac
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import func, select, update, or_, and_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import Lazy, settings
+from database import AsyncSessionLocal
+from models import Business, PaymentEvent, PaymentTransaction
+from services.email import email_service
+from services.snapshots import snapshot_renderer
+
+
+def verify_signature(body: bytes, signature: Optional[str]) -> bool:
+    if not signature:
+        return False
+    expected = hmac.new(
+        settings.paystack_secret_key.encode(),
+        body,
+        hashlib.sha512
+    ).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _business_id(data: dict) -> Optional[UUID]:
+    metadata = data.get('metadata') or {}
+    if not isinstance(metadata, dict):
+        return None
+    try:
+        return UUID(str(metadata.get('business_id')))
+    except ValueError:
+        return None
+
+
+async def record_event(db: AsyncSession, reference: str, event: str, data: dict) -> bool:
+    # Returns True only for the first delivery of a reference
+    inserted = await db.scalar(
+        pg_insert(PaymentEvent)
+        .values(reference=reference, event=event, payload=data)
+        .on_conflict_do_nothing(index_elements=[PaymentEvent.reference])
+        .returning(PaymentEvent.reference)
+    )
+    await db.commit()
+    return inserted is not None
+
+
+# Paystack statuses that never change once reached
+SETTLED_STATUSES = ('success', 'failed', 'reversed')
+
+
+async def settle_verification(db: AsyncSession, reference: str, result: dict) -> PaymentTransaction:
+    metadata = result.get('metadata') or {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+    transaction = PaymentTransaction(
+        reference=reference,
+        status=result['status'],
+        amount=result['amount'],
+        business_id=metadata.get('business_id'),
+        email=(result.get('customer') or {}).get('email', '')
+    )
+
+    if transaction.status in SETTLED_STATUSES:
+        await db.execute(
+            pg_insert(PaymentTransaction)
+            .values(
+                reference=transaction.reference,
+                status=transaction.status,
+                amount=transaction.amount,
+                business_id=transaction.business_id,
+                email=transaction.email
+            )
+            .on_conflict_do_nothing(index_elements=[PaymentTransaction.reference])
+        )
+        await db.commit()
+
+    if transaction.status == 'success':
+        # Shares the webhook's idempotency record, so whichever arrives first
+        # marks the business paid and sends the receipt
+        await record_event(db, reference, 'charge.success', result)
+        payment_jobs.enqueue(reference)
+    else:
+        business_id = _business_id(result)
+        if business_id:
+            business = await db.scalar(select(Business).where(Business.id == business_id))
+            if business and business.payment_status != 'paid':
+                business.payment_status = 'failed'
+                await db.commit()
+
+    return transaction
+
+
+def exhausted(status: str, attempts: int) -> bool:
+    return status == 'failed' and attempts >= settings.payment_job_max_attempts
+
+
+def _claimable():
+    # All times come from the database clock, which also sets claimed_at
+    stale_before = func.now() - func.make_interval(0, 0, 0, 0, 0, 0, settings.payment_job_stale_after)
+    # Failed events wait retry_backoff, doubling with every attempt
+    retry_after = func.make_interval(
+        0, 0, 0, 0, 0, 0,
+        settings.payment_job_retry_backoff * func.power(2, PaymentEvent.attempts - 1)
+    )
+    return or_(
+        PaymentEvent.status == 'received',
+        and_(
+            PaymentEvent.status == 'failed',
+            PaymentEvent.attempts < settings.payment_job_max_attempts,
+            PaymentEvent.claimed_at < func.now() - retry_after
+        ),
+        # Claimed by a worker that died before finishing
+        and_(PaymentEvent.status == 'processing', PaymentEvent.claimed_at < stale_before)
+    )
+
+
+async def process_event(reference: str) -> bool:
+    async with AsyncSessionLocal() as db:
+        # Only one caller can move the event to 'processing', so the status update
+        # and receipt run once however many webhooks and verifies arrive
+        event = await db.scalar(
+            update(PaymentEvent)
+            .where(PaymentEvent.reference == reference, _claimable())
+            .values(
+                status='processing',
+                attempts=PaymentEvent.attempts + 1,
+                claimed_at=func.now()
+            )
+            .returning(PaymentEvent)
+        )
+        await db.commit()
+        if event is None:
+            return False
+
+        try:
+            data = event.payload
+            business = None
+            business_id = _business_id(data)
+            if business_id:
+                business = await db.scalar(select(Business).where(Business.id == business_id))
+            if business:
+                business.payment_status = 'paid'
+                business.paystack_customer_id = (data.get('customer') or {}).get('customer_code')
+                # Queued before the event counts as processed, so a full email
+                # queue fails this attempt and the receipt goes out on a retry
+                email_service.send_payment_receipt(
+                    to_email=business.email,
+                    business_name=business.name,
+                    amount=data.get('amount', 0) / 100,
+                    reference=reference,
+                    page_url=f"{settings.frontend_url}/b/{business.id}"
+                )
+
+            event.status = 'processed'
+            event.processed_at = func.now()
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            await db.execute(
+                update(PaymentEvent)
+                .where(PaymentEvent.reference == reference)
+                .values(status='failed')
+            )
+            await db.commit()
+            print(f"Failed to process payment event {reference}: {str(e)}")
+            return False
+
+    if business:
+        # Paid pages drop the preview notice
+        await snapshot_renderer.regenerate_business(business.id)
+
+    return True
+
+
+class PaymentJobQueue:
+    def __init__(self, sweep_interval: float):
+        self.sweep_interval = sweep_interval
+        self._queue = asyncio.Queue()
+        self._queued = set()
+        self._task = None
+        self._sweeper = None
+        self._stopping = asyncio.Event()
+
+    def enqueue(self, reference: str):
+        # A sweep finds events the webhook or a verify already queued
+        if reference in self._queued:
+            return
+        self._queued.add(reference)
+        self._queue.put_nowait(reference)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    async def _run(self):
+        while True:
+            reference = await self._queue.get()
+            if reference is None:
+                return
+            self._queued.discard(reference)
+            try:
+                await process_event(reference)
+            except Exception as e:
+                print(f"Payment job for {reference} crashed: {str(e)}")
+
+    async def _requeue_pending(self):
+        try:
+            async with AsyncSessionLocal() as db:
+                references = await db.scalars(select(PaymentEvent.reference).where(_claimable()))
+                for reference in references:
+                    self.enqueue(reference)
+        except Exception as e:
+            print(f"Failed to requeue pending payment events: {str(e)}")
+
+    async def _sweep(self):
+        # Retries failed events once their backoff has passed and picks up
+        # events whose worker died, until they run out of attempts
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.sweep_interval)
+            except asyncio.TimeoutError:
+                await self._requeue_pending()
+
+    async def start(self):
+        if self._task is not None:
+            return
+        # Pick up events left behind by a previous process
+        await self._requeue_pending()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._run())
+        self._sweeper = asyncio.create_task(self._sweep())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._stopping.set()
+        await self._sweeper
+        self._sweeper = None
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+
+payment_jobs = Lazy(lambda: PaymentJobQueue(settings.payment_job_sweep_interval))
@@ -0,0 +1,138 @@
+from bisect import bisect_right
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from config import Lazy, settings
+
+WEEKDAYS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+
+def _parse_time(value) -> Optional[time]:
+    if not value:
+        return None
+    try:
+        return time.fromisoformat(str(value).strip())
+    except ValueError:
+        return None
+
+
+def _parse_date(value) -> Optional[date]:
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+def _interval(day: date, open_value, close_value) -> Optional[tuple]:
+    open_time, close_time = _parse_time(open_value), _parse_time(close_value)
+    if open_time is None or close_time is None:
+        return None
+    start = datetime.combine(day, open_time)
+    end = datetime.combine(day, close_time)
+    if end <= start:
+        # Closes after midnight
+        end += timedelta(days=1)
+    return start, end
+
+
+class ScheduleIndex:
+    # Opening intervals in the business's local wall-clock time, merged and sorted
+    # so each query is a bisect over the start times.
+    def __init__(self, start: date, end: date, intervals: list):
+        self.start = start
+        self.end = end
+        self.starts = [interval[0] for interval in intervals]
+        self.ends = [interval[1] for interval in intervals]
+
+    @classmethod
+    def compile(cls, regular_hours: dict, holidays: list, start: date, days: int) -> 'ScheduleIndex':
+        end = start + timedelta(days=days)
+        by_date = {}
+        for holiday in holidays:
+            day = _parse_date(holiday.get('date'))
+            if day is not None and start <= day < end:
+                by_date[day] = holiday
+
+        intervals = []
+        day = start
+        while day < end:
+            holiday = by_date.get(day)
+            if holiday is not None and holiday.get('status') == 'closed':
+                interval = None
+            elif holiday is not None and holiday.get('status') == 'special':
+                interval = _interval(day, holiday.get('open_time'), holiday.get('close_time'))
+            else:
+                hours = (regular_hours or {}).get(WEEKDAYS[day.weekday()]) or {}
+                interval = _interval(day, hours.get('open'), hours.get('close'))
+            if interval is not None:
+                intervals.append(interval)
+            day += timedelta(days=1)
+
+        merged = []
+        for interval_start, interval_end in intervals:
+            if merged and interval_start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], interval_end))
+            else:
+                merged.append((interval_start, interval_end))
+        return cls(start, end, merged)
+
+    def covers(self, at: datetime) -> bool:
+        # Keep a week of lookahead so next_opening can see past long closures
+        return self.start <= at.date() and at + timedelta(days=7) < datetime.combine(self.end, time())
+
+    def _current(self, at: datetime) -> int:
+        return bisect_right(self.starts, at) - 1
+
+    def is_open(self, at: datetime) -> bool:
+        i = self._current(at)
+        return i >= 0 and at < self.ends[i]
+
+    def next_opening(self, at: datetime) -> Optional[datetime]:
+        i = bisect_right(self.starts, at)
+        return self.starts[i] if i < len(self.starts) else None
+
+    def next_closing(self, at: datetime) -> Optional[datetime]:
+        i = self._current(at)
+        if i >= 0 and at < self.ends[i]:
+            return self.ends[i]
+        return self.ends[i + 1] if i + 1 < len(self.ends) else None
+
+
+class ScheduleCache:
+    def __init__(self, max_entries: int, horizon_days: int):
+        self.max_entries = max_entries
+        self.horizon_days = horizon_days
+        self._entries = OrderedDict()
+
+    def get(self, page_id, version: tuple, at: datetime) -> Optional[ScheduleIndex]:
+        entry = self._entries.get(page_id)
+        if entry is None:
+            return None
+        cached_version, index = entry
+        # Any page or template write changes the version, so stale indexes are
+        # never served even when another worker made the edit
+        if cached_version != version or not index.covers(at):
+            return None
+        self._entries.move_to_end(page_id)
+        return index
+
+    def compile(self, page_id, version: tuple, payload: dict, at: datetime) -> ScheduleIndex:
+        # Starts a day early so intervals running past midnight are included
+        index = ScheduleIndex.compile(
+            payload.get('regular_hours') or {},
+            payload.get('holidays') or [],
+            at.date() - timedelta(days=1),
+            self.horizon_days
+        )
+        self._entries[page_id] = (version, index)
+        self._entries.move_to_end(page_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return index
+
+    def invalidate(self, page_id):
+        self._entries.pop(page_id, None)
+
+
+schedule_cache = Lazy(lambda: ScheduleCache(settings.schedule_cache_size, settings.schedule_horizon_days))
@@ -0,0 +1,262 @@
+import asyncio
+import html
+import json
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time
+from typing import Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.orm import joinedload
+
+from config import Lazy, settings
+from database import AsyncSessionLocal
+from models import Page
+from schemas import BusinessResponse
+from services.templates import page_payload
+
+try:
+    import fcntl
+except ImportError:
+    # Windows; only single-process servers run there
+    fcntl = None
+
+PAGE_LAYOUT = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{name} - Holiday Hours</title>
+<meta name="description" content="Holiday opening hours for {name}">
+<link rel="canonical" href="{page_url}">
+<style>
+body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #0f172a; background: #f8fafc; margin: 0; }}
+main {{ max-width: 720px; margin: 0 auto; padding: 32px 16px; }}
+h1 {{ font-size: 2.5rem; text-align: center; margin-bottom: 8px; }}
+.contact {{ text-align: center; color: #475569; }}
+.notice {{ background: #fefce8; border: 2px solid #fef08a; color: #854d0e; padding: 16px; border-radius: 8px; text-align: center; }}
+.holiday {{ display: flex; justify-content: space-between; padding: 16px 0; border-bottom: 1px solid #e2e8f0; }}
+.holiday .date {{ color: #475569; }}
+.holiday .notes {{ color: #475569; font-style: italic; font-size: 0.875rem; }}
+.closed {{ color: #dc2626; }}
+.special {{ color: #2563eb; }}
+.normal {{ color: #16a34a; }}
+footer {{ text-align: center; color: #64748b; font-size: 0.875rem; margin-top: 32px; }}
+</style>
+</head>
+<body>
+<main>
+{notice}<h1>{name}</h1>
+<div class="contact">{contact}</div>
+<h2>Holiday Hours</h2>
+{holidays}
+<footer>Last updated: {updated}</footer>
+</main>
+</body>
+</html>
+"""
+
+HOLIDAY_ROW = """<div class="holiday">
+<div><strong>{name}</strong><div class="date">{date}</div>{notes}</div>
+<div class="{status}">{status_text}</div>
+</div>
+"""
+
+PREVIEW_NOTICE = (
+    '<p class="notice">Preview Mode - Complete payment to remove this notice '
+    'and enable all features</p>\n'
+)
+
+
+def _format_date(value: str) -> str:
+    try:
+        day = date.fromisoformat(value[:10])
+    except ValueError:
+        return value
+    return f"{day:%A, %B} {day.day}, {day.year}"
+
+
+def _format_time(value: Optional[str]) -> str:
+    try:
+        parsed = time.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value or ''
+    return f"{parsed.hour % 12 or 12}:{parsed.minute:02d} {'PM' if parsed.hour >= 12 else 'AM'}"
+
+
+def _status_text(holiday: dict) -> str:
+    # Mirrors getHolidayStatus in lib/utils-holidays.ts
+    if holiday.get('status') == 'closed':
+        return 'Closed'
+    if holiday.get('status') == 'special' and holiday.get('open_time') and holiday.get('close_time'):
+        return f"{_format_time(holiday['open_time'])} - {_format_time(holiday['close_time'])}"
+    return 'Normal Hours'
+
+
+def render_html(bundle: dict) -> str:
+    business, page = bundle['business'], bundle['page']
+    e = html.escape
+
+    contact = [e(business[field]) for field in ('address', 'phone', 'email') if business.get(field)]
+    holidays = sorted(page['holidays'], key=lambda holiday: holiday.get('date') or '')
+    rows = ''.join(
+        HOLIDAY_ROW.format(
+            name=e(holiday.get('name') or ''),
+            date=e(_format_date(holiday.get('date') or '')),
+            notes=f'<div class="notes">{e(holiday["notes"])}</div>' if holiday.get('notes') else '',
+            status=e(holiday.get('status') or 'normal'),
+            status_text=e(_status_text(holiday))
+        )
+        for holiday in holidays
+    ) or '<p>No holidays configured yet.</p>\n'
+
+    return PAGE_LAYOUT.format(
+        name=e(business['name']),
+        page_url=e(f"{settings.frontend_url}/b/{business['id']}"),
+        notice='' if business['payment_status'] == 'paid' else PREVIEW_NOTICE,
+        contact=' &middot; '.join(contact),
+        holidays=rows,
+        updated=e(datetime.fromisoformat(page['updated_at']).strftime('%B %d, %Y'))
+    )
+
+
+class SnapshotStore:
+    # Writes <directory>/<page_id>/index.html and page.json. Keys are stable, so
+    # the directory can be served as-is or synced to an object store.
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, page_id: UUID, filename: str) -> str:
+        return os.path.join(self.directory, str(page_id), filename)
+
+    def _write_atomic(self, path: str, content: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.chmod(tmp_path, 0o644)
+            # Readers see either the old file or the new one, never a partial write
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def write(self, page_id: UUID, html_content: str, json_content: str):
+        self._write_atomic(self.path(page_id, 'page.json'), json_content)
+        self._write_atomic(self.path(page_id, 'index.html'), html_content)
+
+    def delete(self, page_id: UUID):
+        shutil.rmtree(os.path.join(self.directory, str(page_id)), ignore_errors=True)
+
+    @asynccontextmanager
+    async def lock(self, page_id: UUID):
+        # Workers of one server share the directory, so renders of a page are
+        # also ordered across processes. Kept outside the page's own directory,
+        # which delete() removes.
+        if fcntl is None:
+            yield
+            return
+        path = os.path.join(self.directory, '.locks', str(page_id))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        lock_file = open(path, 'a')
+        try:
+            await asyncio.to_thread(fcntl.flock, lock_file, fcntl.LOCK_EX)
+            yield
+        finally:
+            # Closing the file releases the lock
+            lock_file.close()
+
+
+class SnapshotRenderer:
+    def __init__(self, store: SnapshotStore, enabled: bool):
+        self.store = store
+        self.enabled = enabled
+        self._locks = {}
+
+    async def _render(self, db, page_id: UUID):
+        page = await db.scalar(
+            select(Page)
+            .options(joinedload(Page.business))
+            .where(Page.id == page_id)
+        )
+        if not page or not page.business:
+            await asyncio.to_thread(self.store.delete, page_id)
+            return
+
+        bundle = {
+            'business': BusinessResponse.model_validate(page.business).model_dump(mode='json'),
+            'page': await page_payload(db, page),
+        }
+        await asyncio.to_thread(
+            self.store.write,
+            page_id,
+            render_html(bundle),
+            json.dumps(bundle, separators=(',', ':'))
+        )
+
+    async def regenerate(self, page_id: UUID):
+        if not self.enabled:
+            return
+        # Renders of one page run one at a time and each reads the latest committed
+        # row, so the last write always reflects the newest edit
+        entry = self._locks.setdefault(page_id, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0], self.store.lock(page_id):
+                async with AsyncSessionLocal() as db:
+                    await self._render(db, page_id)
+        except Exception as e:
+            print(f"Failed to render snapshot for {page_id}: {str(e)}")
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[page_id]
+
+    async def regenerate_many(self, page_ids: Iterable[UUID]):
+        for page_id in page_ids:
+            await self.regenerate(page_id)
+
+    async def regenerate_business(self, business_id: UUID):
+        # The page shows business details and the preview notice
+        if not self.enabled:
+            return
+        async with AsyncSessionLocal() as db:
+            page_ids = list(await db.scalars(select(Page.id).where(Page.business_id == business_id)))
+        await self.regenerate_many(page_ids)
+
+    async def regenerate_template(self, template_id: str):
+        if not self.enabled:
+            return
+        async with AsyncSessionLocal() as db:
+            page_ids = list(await db.scalars(select(Page.id).where(Page.template_id == template_id)))
+        await self.regenerate_many(page_ids)
+
+    async def rebuild_all(self, batch_size: int = 500) -> int:
+        # Used by rebuild_snapshots.py; renders every page regardless of `enabled`
+        count = 0
+        last_id = None
+        async with AsyncSessionLocal() as db:
+            while True:
+                query = select(Page.id).order_by(Page.id).limit(batch_size)
+                if last_id is not None:
+                    query = query.where(Page.id > last_id)
+                page_ids = list(await db.scalars(query))
+                if not page_ids:
+                    return count
+                for page_id in page_ids:
+                    # One page failing to render does not stop the rest
+                    try:
+                        await self._render(db, page_id)
+                        count += 1
+                    except Exception as e:
+                        await db.rollback()
+                        print(f"Failed to render snapshot for {page_id}: {str(e)}")
+                db.expunge_all()
+                last_id = page_ids[-1]
+
+
+snapshot_renderer = Lazy(lambda: SnapshotRenderer(SnapshotStore(settings.snapshot_dir), settings.snapshots_enabled))
@@ -0,0 +1,170 @@
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import Lazy, settings
+from models import HolidayTemplate, Page
+from schemas import PageResponse
+from services.cache import page_cache
+
+
+def holiday_key(holiday: dict) -> tuple:
+    return holiday['name'], holiday['date']
+
+
+def unique_dates(template_holidays: list) -> dict:
+    # Dates of the template holidays whose name appears once. Only those can be
+    # stored without a date, since the name alone identifies them.
+    dates = {}
+    seen = set()
+    for holiday in template_holidays:
+        if holiday['name'] in seen:
+            dates.pop(holiday['name'], None)
+        else:
+            dates[holiday['name']] = holiday['date']
+        seen.add(holiday['name'])
+    return dates
+
+
+def stored_key(holiday: dict, dates: dict) -> tuple:
+    # The (name, date) key of a stored override or exclusion. One without a date
+    # follows its template holiday's date (and so its yearly rollover).
+    return holiday['name'], holiday.get('date', dates.get(holiday['name']))
+
+
+def merge_holidays(template_holidays: list, overrides: list, excluded: list) -> list:
+    # Holidays are identified by (name, date), as in PATCH /holidays. Template
+    # holidays keep their order; a page override with the same key replaces the
+    # entry's fields. Overrides matching no template holiday are the page's own
+    # additions and follow in their stored order.
+    dates = unique_dates(template_holidays)
+    by_key = {stored_key(holiday, dates): holiday for holiday in overrides}
+    excluded = {stored_key(holiday, dates) for holiday in excluded}
+    merged = []
+    for holiday in template_holidays:
+        key = holiday_key(holiday)
+        override = by_key.pop(key, None)
+        if key in excluded:
+            continue
+        if override is None:
+            merged.append(holiday)
+        else:
+            merged.append({**holiday, **override})
+    # An undated override whose template holiday is gone has nothing to modify
+    merged.extend(holiday for holiday in by_key.values() if 'date' in holiday)
+    return merged
+
+
+def split_holidays(template_holidays: list, holidays: list) -> tuple:
+    # Inverse of merge_holidays: keeps only what differs from the template, so a
+    # page that picks template holidays as-is stores nothing for them. A holiday
+    # moved to another date is stored as an addition plus an exclusion.
+    dates = unique_dates(template_holidays)
+    template_by_key = {holiday_key(holiday): holiday for holiday in template_holidays}
+    submitted = {holiday_key(holiday) for holiday in holidays}
+    overrides = []
+    for holiday in holidays:
+        template_holiday = template_by_key.get(holiday_key(holiday))
+        if template_holiday is not None:
+            if holiday == template_holiday:
+                continue
+            if dates.get(holiday['name']) == holiday['date']:
+                holiday = {key: value for key, value in holiday.items() if key != 'date'}
+        overrides.append(holiday)
+    excluded = []
+    for key, holiday in template_by_key.items():
+        if key in submitted:
+            continue
+        if dates.get(holiday['name']) == holiday['date']:
+            excluded.append({'name': holiday['name']})
+        else:
+            excluded.append({'name': holiday['name'], 'date': holiday['date']})
+    return overrides, excluded
+
+
+def template_payload(template: HolidayTemplate) -> dict:
+    return {
+        'id': template.id,
+        'name': template.name,
+        'country': template.country,
+        'year': template.year,
+        'holidays': template.holidays,
+        'updated_at': template.updated_at.isoformat(),
+    }
+
+
+class TemplateResolver:
+    def __init__(self, merge_cache_size: int):
+        self.merge_cache_size = merge_cache_size
+        self._merged = OrderedDict()
+
+    async def get_template(
+        self,
+        db: AsyncSession,
+        template_id: str,
+        updated_at: Optional[datetime] = None
+    ) -> Optional[dict]:
+        key = page_cache.template_key(template_id)
+        payload = await page_cache.get(key)
+        if payload is not None and page_cache.revalidate:
+            # Another worker may have changed the template. Without a known
+            # updated_at to compare against, load it again.
+            if updated_at is None or datetime.fromisoformat(payload['updated_at']) != updated_at:
+                payload = None
+        if payload is None:
+            generation = await page_cache.generation()
+            template = await db.scalar(select(HolidayTemplate).where(HolidayTemplate.id == template_id))
+            if not template:
+                return None
+            payload = template_payload(template)
+            await page_cache.set(key, payload, generation)
+        return payload
+
+    async def invalidate(self, template_id: str):
+        await page_cache.invalidate_template(template_id)
+
+    def _merge(self, page: dict, template: dict) -> list:
+        # Both timestamps change on every write, so they identify the inputs
+        key = (page['id'], page['updated_at'], template['id'], template['updated_at'])
+        merged = self._merged.get(key)
+        if merged is None:
+            merged = merge_holidays(template['holidays'], page['holidays'], page['excluded_holidays'])
+            self._merged[key] = merged
+            while len(self._merged) > self.merge_cache_size:
+                self._merged.popitem(last=False)
+        else:
+            self._merged.move_to_end(key)
+        return merged
+
+    async def resolve(self, db: AsyncSession, page: dict, template_updated_at: Optional[datetime] = None) -> dict:
+        # Takes a stored PageResponse payload and returns it with the template's
+        # holidays merged in
+        if not page.get('template_id'):
+            return page
+        template = await self.get_template(db, page['template_id'], template_updated_at)
+        if template is None:
+            return page
+        return {
+            **page,
+            'holidays': self._merge(page, template),
+            'template_updated_at': template['updated_at'],
+        }
+
+
+async def page_payload(db: AsyncSession, page: Page) -> dict:
+    payload = PageResponse.model_validate(page).model_dump(mode="json")
+    return await template_resolver.resolve(db, payload)
+
+
+def last_modified(payload: dict) -> datetime:
+    # A page changes when either its own row or its template changes
+    modified = datetime.fromisoformat(payload['updated_at'])
+    if payload.get('template_updated_at'):
+        modified = max(modified, datetime.fromisoformat(payload['template_updated_at']))
+    return modified
+
+
+template_resolver = Lazy(lambda: TemplateResolver(settings.template_merge_cache_size))
@@ -0,0 +1,166 @@
+import asyncio
+import os
+import socket
+import time
+from typing import Optional
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+import config
+from config import Settings, resolve
+from database import AsyncSessionLocal
+from services.auth import auth_service
+from services.email import BaseEmailService, email_service
+import main
+from benchmarks import mock_paystack as mock_paystack_app
+
+# The tests run the app against a real Postgres database with the migrations
+# in supabase/migrations applied. Every table except holiday_templates is
+# emptied after each test, so never point TEST_DATABASE_URL at real data.
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+TABLES = "businesses, pages, analytics, analytics_daily, payment_events, payment_transactions"
+
+
+class RecordingEmailService(BaseEmailService):
+    # Renders the emails like the real services but keeps them in memory
+    def __init__(self):
+        self.sent = []
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def _send(self, to_email, rendered, description):
+        self.sent.append((to_email, description))
+
+
+def make_settings(database_url: str, **overrides) -> Settings:
+    return Settings(
+        _env_file=None,
+        database_url=database_url,
+        supabase_url="http://supabase.test",
+        supabase_key="test",
+        secret_key="test-secret-key",
+        paystack_secret_key="sk_test",
+        paystack_public_key="pk_test",
+        resend_api_key="test",
+        from_email="noreply@test",
+        app_url="http://app.test",
+        api_url="http://api.test",
+        frontend_url="http://app.test",
+        allowed_origins="http://app.test",
+        smtp_user="test",
+        smtp_password="test",
+        admin_api_key="test-admin-key",
+        **overrides
+    )
+
+
+@pytest.fixture
+def settings():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    return make_settings(TEST_DATABASE_URL, analytics_buffer_views=False)
+
+
+@pytest.fixture
+def unit_settings():
+    # Settings for tests that run without the app or a database; nothing ever
+    # connects to the URL
+    config.configure(make_settings("postgresql://test@localhost/unused"))
+    yield resolve(config.settings)
+    config.close_services()
+    config.reset_services()
+
+
+@pytest.fixture
+def emails(settings):
+    return RecordingEmailService()
+
+
+@pytest.fixture
+def client(settings, emails):
+    app = main.create_app(settings)
+    config.override(email_service, emails)
+    with TestClient(app) as client:
+        yield client
+        client.portal.call(execute, f"TRUNCATE {TABLES} CASCADE")
+    config.reset_services()
+
+
+async def execute(statement: str, params: Optional[dict] = None):
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(text(statement), params or {})
+        rows = result.fetchall() if result.returns_rows else None
+        await db.commit()
+        return rows
+
+
+def query(client: TestClient, statement: str, **params) -> list:
+    return client.portal.call(execute, statement, params)
+
+
+def gather(client: TestClient, requests: list) -> list:
+    # Sends the requests concurrently on the app's event loop
+    async def send_all():
+        transport = httpx.ASGITransport(app=client.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            return await asyncio.gather(*[http.request(method, url, **kwargs) for method, url, kwargs in requests])
+
+    return client.portal.call(send_all)
+
+
+def wait_for_event(client, reference: str, timeout: float = 5.0) -> tuple:
+    deadline = time.monotonic() + timeout
+    while True:
+        rows = query(client, "SELECT status, attempts FROM payment_events WHERE reference = :reference",
+                     reference=reference)
+        if (rows and rows[0].status == "processed") or time.monotonic() > deadline:
+            return rows
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def page(client):
+    business = client.post("/api/businesses", json={"name": "Corner Shop", "email": "owner@example.com"})
+    assert business.status_code == 201, business.text
+    business_id = business.json()["id"]
+    created = client.post("/api/pages", json={
+        "business_id": business_id,
+        "holidays": [
+            {"name": "New Year's Day", "date": "2026-01-01", "status": "closed"},
+            {"name": "Store Anniversary", "date": "2026-03-03", "status": "special",
+             "open_time": "10:00", "close_time": "14:00"},
+        ],
+    })
+    assert created.status_code == 201, created.text
+    return created.json()
+
+
+def auth_headers(page: dict) -> dict:
+    token = auth_service.generate_magic_link_token("owner@example.com", page["business_id"])
+    return {"Authorization": f"Bearer {token}"}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def mock_paystack():
+    # The mock Paystack API from benchmarks, served over real connections
+    mock_paystack_app.reset()
+    mock_paystack_app.app.state.hang_seconds = 1.0
+    port = free_port()
+    server = mock_paystack_app.serve_in_thread(port=port)
+    mock_paystack_app.app.state.url = f"http://127.0.0.1:{port}"
+    yield mock_paystack_app.app.state
+    server.should_exit = True
@@ -0,0 +1,79 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from services import analytics
+from services.analytics import ViewBuffer, view_buffer
+from tests.conftest import gather
+
+
+@pytest.mark.parametrize("buffered", [False, True])
+def test_concurrent_views_are_all_recorded(client, settings, page, buffered):
+    settings.analytics_buffer_views = buffered
+    views = 50
+
+    responses = gather(client, [
+        ("POST", f"/api/analytics/{page['id']}/view", {"json": {"source": "direct"}})
+        for _ in range(views)
+    ])
+    assert [response.status_code for response in responses] == [200] * views
+    if buffered:
+        client.portal.call(view_buffer.flush)
+
+    analytics = client.get(f"/api/analytics/{page['id']}").json()
+    assert analytics["views"] == views
+    assert sum(row["count"] for row in analytics["sources"]) == views
+
+
+def test_view_of_missing_page_is_404(client):
+    response = client.post(
+        "/api/analytics/00000000-0000-0000-0000-000000000000/view",
+        json={"source": "direct"}
+    )
+    assert response.status_code == 404
+
+
+class BrokenSession:
+    # Fails the flush, and the rollback when the session closes
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        raise ConnectionError("connection lost during rollback")
+
+    async def scalars(self, *args, **kwargs):
+        raise ConnectionError("connection lost")
+
+
+def test_failed_flush_keeps_views_even_if_rollback_fails(monkeypatch):
+    buffer = ViewBuffer(flush_interval=60, flush_threshold=100)
+    page_id = uuid4()
+    buffer.add(page_id, "direct", 3)
+    monkeypatch.setattr(analytics, "AsyncSessionLocal", BrokenSession)
+
+    assert asyncio.run(buffer.flush()) == 0
+    assert buffer.pending() == 3
+    assert sum(buffer._counts.values()) == 3
+
+
+def test_flush_loop_survives_errors(monkeypatch):
+    buffer = ViewBuffer(flush_interval=0.01, flush_threshold=100)
+    calls = []
+
+    async def flush():
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("flush failed")
+        return 0
+
+    monkeypatch.setattr(buffer, "flush", flush)
+
+    async def run():
+        buffer.start()
+        while len(calls) < 3:
+            await asyncio.sleep(0.01)
+        await buffer.stop()
+
+    asyncio.run(asyncio.wait_for(run(), 5))
+    assert len(calls) >= 3
@@ -0,0 +1,95 @@
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import config
+from config import settings
+from services.auth import auth_service
+from tests.conftest import auth_headers
+
+
+def rotate(new_key: str, previous_keys: str):
+    config.override(settings, settings.model_copy(update={
+        "secret_key": new_key,
+        "previous_secret_keys": previous_keys,
+    }))
+    config.reset(auth_service)
+
+
+def test_token_signed_with_previous_key_still_verifies(client, page):
+    token = auth_service.generate_magic_link_token("owner@example.com", page["business_id"])
+
+    rotate("rotated-secret-key", "test-secret-key")
+    payload = auth_service.verify_magic_link_token(token)
+    assert payload["business_id"] == page["business_id"]
+
+    response = client.put(
+        f"/api/pages/{page['id']}",
+        json={"custom_css": ""},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+
+
+def test_new_tokens_are_signed_with_current_key(client, page):
+    rotate("rotated-secret-key", "test-secret-key")
+    token = auth_service.generate_magic_link_token("owner@example.com", page["business_id"])
+
+    rotate("rotated-secret-key", "")
+    assert auth_service.verify_magic_link_token(token)["email"] == "owner@example.com"
+
+
+def test_token_from_retired_key_is_rejected(client, page):
+    headers = auth_headers(page)
+
+    rotate("rotated-secret-key", "")
+    response = client.put(f"/api/pages/{page['id']}", json={"custom_css": ""}, headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Invalid token"
+
+
+def test_rotation_without_the_app(unit_settings):
+    token = auth_service.generate_magic_link_token("owner@example.com", "b1")
+
+    rotate("rotated-secret-key", "test-secret-key")
+    assert auth_service.verify_magic_link_token(token)["business_id"] == "b1"
+
+    rotate("rotated-secret-key", "")
+    with pytest.raises(ValueError, match="Invalid token"):
+        auth_service.verify_magic_link_token(token)
+
+
+def test_cached_token_expires(unit_settings, monkeypatch):
+    token = auth_service.generate_magic_link_token("owner@example.com", "b1")
+    assert auth_service.verify_magic_link_token(token)["email"] == "owner@example.com"
+
+    later = time.time() + unit_settings.magic_link_expiry + 1
+    monkeypatch.setattr(time, "time", lambda: later)
+    with pytest.raises(ValueError, match="Token has expired"):
+        auth_service.verify_magic_link_token(token)
+
+
+def test_cache_is_safe_across_threads(unit_settings):
+    # Smaller than the token set, so threads hit and evict the same entries
+    unit_settings.token_cache_size = 8
+    tokens = [
+        auth_service.generate_magic_link_token(f"owner{i}@example.com", "b1")
+        for i in range(16)
+    ]
+
+    def verify_all(offset: int):
+        rng = random.Random(offset)
+        for _ in range(5000):
+            auth_service.verify_magic_link_token(rng.choice(tokens))
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for future in [pool.submit(verify_all, i) for i in range(8)]:
+                future.result()
+    finally:
+        sys.setswitchinterval(interval)
@@ -0,0 +1,55 @@
+import asyncio
+
+from services.bulk_import import iter_csv_records
+
+ADMIN = {"X-Admin-Key": "test-admin-key"}
+
+
+def parse_csv(body: str) -> list:
+    async def lines():
+        for line in body.split("\n"):
+            yield line
+
+    async def collect():
+        return [
+            (row, str(record) if isinstance(record, Exception) else record)
+            async for row, record in iter_csv_records(lines())
+        ]
+
+    return asyncio.run(collect())
+
+
+def test_csv_quoting():
+    records = parse_csv(
+        'name,email,address\n'
+        'Screen Shop,a@example.com,Unit 5" Mall\n'
+        '"Shop, Two",b@example.com,"Line one\n'
+        'Line two"\n'
+        '\n'
+        'Quote Shop,c@example.com,"He said ""hi"""\n'
+    )
+    assert records == [
+        (1, {"name": "Screen Shop", "email": "a@example.com", "address": 'Unit 5" Mall'}),
+        (2, {"name": "Shop, Two", "email": "b@example.com", "address": "Line one\nLine two"}),
+        (3, {"name": "Quote Shop", "email": "c@example.com", "address": 'He said "hi"'}),
+    ]
+
+
+def test_csv_unterminated_quote():
+    records = parse_csv('name,email\nShop,"a@example.com\nOther,b@example.com\n')
+    assert records == [(1, "Unterminated quoted field")]
+
+
+def test_bulk_import_requires_admin_key(client):
+    body = b"name,email\nShop,a@example.com\n"
+    headers = {"content-type": "text/csv"}
+
+    assert client.post("/api/businesses/bulk", content=body, headers=headers).status_code == 401
+    assert client.post(
+        "/api/businesses/bulk", content=body, headers={**headers, "X-Admin-Key": "wrong"}
+    ).status_code == 401
+
+    response = client.post("/api/businesses/bulk", content=body, headers={**headers, **ADMIN})
+    assert response.status_code == 200
+    assert len(response.json()["created"]) == 1
+    assert response.json()["errors"] == []
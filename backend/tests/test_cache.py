@@ -0,0 +1,115 @@
+import asyncio
+import time
+
+import fakeredis
+import pytest
+
+import config
+from services.cache import MemoryCache, PageCache, RedisCache, page_cache
+from tests.conftest import auth_headers
+
+
+class FailingBackend(MemoryCache):
+    async def generation(self) -> int:
+        raise ConnectionError("cache is down")
+
+    async def get(self, key: str):
+        raise ConnectionError("cache is down")
+
+    async def delete(self, *keys: str):
+        raise ConnectionError("cache is down")
+
+
+def memory_cache():
+    return MemoryCache(max_entries=10, ttl=60)
+
+
+def redis_cache():
+    return RedisCache("redis://unused", ttl=60, client=fakeredis.FakeAsyncRedis())
+
+
+backends = pytest.mark.parametrize("make_backend", [memory_cache, redis_cache], ids=["memory", "redis"])
+
+
+@backends
+def test_invalidation_drops_page_and_business_entries(make_backend):
+    cache = PageCache(make_backend())
+
+    async def scenario():
+        generation = await cache.generation()
+        await cache.set(cache.page_key("page"), {"id": "page"}, generation)
+        await cache.set(cache.business_key("business"), {"id": "page"}, generation)
+        await cache.set(cache.page_key("other"), {"id": "other"}, generation)
+        assert await cache.get(cache.page_key("page")) == {"id": "page"}
+
+        await cache.invalidate("page", "business")
+        assert await cache.get(cache.page_key("page")) is None
+        assert await cache.get(cache.business_key("business")) is None
+        assert await cache.get(cache.page_key("other")) == {"id": "other"}
+
+    asyncio.run(scenario())
+    assert (cache.hits, cache.misses) == (2, 2)
+
+
+@backends
+def test_set_after_invalidation_is_skipped(make_backend):
+    cache = PageCache(make_backend())
+    key = cache.page_key("page")
+
+    async def scenario():
+        # A reader loads the old row, then the edit commits and invalidates
+        # before the reader stores it
+        generation = await cache.generation()
+        await cache.invalidate("page", "business")
+        await cache.set(key, {"version": "old"}, generation)
+        assert await cache.get(key) is None
+
+        generation = await cache.generation()
+        await cache.set(key, {"version": "new"}, generation)
+        assert await cache.get(key) == {"version": "new"}
+
+    asyncio.run(scenario())
+
+
+def test_memory_cache_evicts_least_recently_used_and_expired_entries(monkeypatch):
+    backend = MemoryCache(max_entries=2, ttl=60)
+
+    async def scenario():
+        await backend.set("a", {"v": "a"}, 0)
+        await backend.set("b", {"v": "b"}, 0)
+        await backend.get("a")
+        await backend.set("c", {"v": "c"}, 0)
+        assert await backend.get("b") is None
+        assert await backend.get("a") == {"v": "a"}
+
+        later = time.monotonic() + 61
+        monkeypatch.setattr(time, "monotonic", lambda: later)
+        assert await backend.get("a") is None
+
+    asyncio.run(scenario())
+
+
+def test_unreachable_cache_is_a_miss():
+    cache = PageCache(FailingBackend(max_entries=10, ttl=60))
+
+    async def scenario():
+        generation = await cache.generation()
+        assert generation is None
+        await cache.set(cache.page_key("page"), {"id": "page"}, generation)
+        await cache.invalidate("page", "business")
+        assert await cache.get(cache.page_key("page")) is None
+
+    asyncio.run(scenario())
+    assert cache.misses == 1
+
+
+def test_invalidation_failure_does_not_fail_the_edit(client, page):
+    config.override(page_cache, PageCache(FailingBackend(max_entries=10, ttl=60)))
+
+    response = client.put(
+        f"/api/pages/{page['id']}",
+        json={"custom_css": "body { color: red; }"},
+        headers=auth_headers(page)
+    )
+    assert response.status_code == 200
+    assert response.json()["custom_css"] == "body { color: red; }"
@@ -0,0 +1,36 @@
+import asyncio
+
+import config
+from config import is_built, resolve
+from database import async_engine, engine
+
+
+def test_configure_disposes_sync_engine(settings):
+    config.configure(settings)
+    built = resolve(engine)
+    with built.connect():
+        pass
+    assert built.pool.checkedin() == 1
+
+    config.configure(settings)
+    assert not is_built(engine)
+    assert built.pool.checkedin() == 0
+
+
+def test_configure_disposes_async_engine(settings):
+    async def scenario():
+        config.configure(settings)
+        built = resolve(async_engine)
+        async with built.connect():
+            pass
+        pool = built.pool
+        assert pool.checkedin() == 1
+
+        config.configure(settings)
+        assert not is_built(async_engine)
+        # Scheduled on the running loop
+        while config._closing:
+            await asyncio.sleep(0.01)
+        assert pool.checkedin() == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,112 @@
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from services.email import BaseEmailService, EmailQueue, EmailQueueFull, SMTPTransport
+from tests.conftest import free_port
+
+
+class DroppingHandler:
+    # Records delivered messages and drops the connection, mid-session, the
+    # first time it is handed a message whose subject is in `drop`
+    def __init__(self, drop=()):
+        self.drop = set(drop)
+        self.delivered = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        subject = envelope.content.decode().split("Subject: ", 1)[1].splitlines()[0]
+        if subject in self.drop:
+            self.drop.discard(subject)
+            server.transport.close()
+            return "421 Closing connection"
+        self.delivered.append(subject)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server():
+    def start(handler):
+        controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+        controller.start()
+        servers.append(controller)
+        return controller
+
+    servers = []
+    yield start
+    for controller in servers:
+        controller.stop()
+
+
+def message(subject: str) -> EmailMessage:
+    msg = EmailMessage()
+    msg["From"] = "noreply@example.com"
+    msg["To"] = "owner@example.com"
+    msg["Subject"] = subject
+    msg.set_content("Hello")
+    return msg
+
+
+def email_queue(controller, maxsize: int = 10, max_retries: int = 2) -> EmailQueue:
+    return EmailQueue(
+        lambda: SMTPTransport(controller.hostname, controller.port, "", "", starttls=False, timeout=5),
+        maxsize=maxsize,
+        workers=1,
+        max_retries=max_retries,
+        retry_backoff=0.01
+    )
+
+
+def test_messages_share_one_connection(smtp_server):
+    handler = DroppingHandler()
+    queue = email_queue(smtp_server(handler))
+    queue.start()
+    for i in range(3):
+        queue.enqueue(message(f"message {i}"), "test email")
+    queue.stop(timeout=10)
+
+    assert handler.delivered == ["message 0", "message 1", "message 2"]
+    assert len(handler.sessions) == 1
+
+
+def test_dropped_connection_is_reopened_and_message_retried(smtp_server):
+    handler = DroppingHandler(drop={"second"})
+    queue = email_queue(smtp_server(handler))
+    queue.start()
+    for subject in ["first", "second", "third"]:
+        queue.enqueue(message(subject), "test email")
+    queue.stop(timeout=10)
+
+    assert handler.delivered == ["first", "second", "third"]
+    assert len(handler.sessions) == 2
+
+
+def test_message_is_dropped_after_max_retries(smtp_server, capsys):
+    handler = DroppingHandler(drop={"first"})
+    queue = email_queue(smtp_server(handler), max_retries=0)
+    queue.start()
+    queue.enqueue(message("first"), "test email")
+    queue.enqueue(message("second"), "test email")
+    queue.stop(timeout=10)
+
+    assert handler.delivered == ["second"]
+    assert "Failed to send test email after 1 attempts" in capsys.readouterr().out
+
+
+def test_full_queue_raises(smtp_server):
+    queue = email_queue(smtp_server(DroppingHandler()), maxsize=2)
+    queue.enqueue(message("first"), "test email")
+    queue.enqueue(message("second"), "test email")
+    with pytest.raises(EmailQueueFull):
+        queue.enqueue(message("third"), "test email")
+    assert queue.depth() == 2
+
+
+def test_email_service_must_implement_send():
+    class Incomplete(BaseEmailService):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,23 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_ready_hides_database_errors(settings, capsys):
+    unreachable = settings.model_copy(update={
+        "database_url": "postgresql://secret_user:secret_password@/missing?host=/nonexistent",
+    })
+    with TestClient(main.create_app(unreachable)) as client:
+        response = client.get("/ready")
+
+    assert response.status_code == 503
+    database = response.json()["checks"]["database"]
+    assert database == {"ok": False, "error": "unreachable"}
+    assert "secret_user" not in response.text
+    assert "Readiness database check failed" in capsys.readouterr().out
+
+
+def test_ready(client):
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
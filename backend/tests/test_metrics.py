@@ -0,0 +1,22 @@
+import re
+
+
+def metric_types(text: str) -> dict:
+    return dict(re.findall(r"^# TYPE (\S+) (\S+)$", text, re.M))
+
+
+def test_metrics_endpoint(client, page):
+    client.get(f"/api/pages/{page['id']}")
+    client.get(f"/api/pages/{page['id']}")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    types = metric_types(response.text)
+    # Running totals are counters, so rate() and increase() work on them
+    for name in ("http_requests_total", "db_statements_total", "page_cache_lookups_total",
+                 "db_pool_checkout_wait_seconds_total", "db_pool_timeouts_total"):
+        assert types[name] == "counter"
+    for name in ("http_requests_in_flight", "db_pool_connections", "queue_depth"):
+        assert types[name] == "gauge"
+    assert 'http_requests_total{method="GET",route="/api/pages/{page_id}",status="200"}' in response.text
+    assert re.search(r'^page_cache_lookups_total\{result="hit"\} [1-9]', response.text, re.M)
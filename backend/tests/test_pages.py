@@ -0,0 +1,85 @@
+from tests.conftest import auth_headers
+
+
+def test_edit_invalidates_cached_page(client, page):
+    first = client.get(f"/api/pages/{page['id']}")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert client.get(f"/api/pages/{page['id']}", headers={"If-None-Match": etag}).status_code == 304
+
+    updated = client.put(
+        f"/api/pages/{page['id']}",
+        json={"custom_css": "body { color: red; }"},
+        headers=auth_headers(page)
+    )
+    assert updated.status_code == 200
+
+    after = client.get(f"/api/pages/{page['id']}", headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.json()["custom_css"] == "body { color: red; }"
+    assert after.headers["etag"] != etag
+    by_business = client.get(f"/api/pages/business/{page['business_id']}")
+    assert by_business.json()["custom_css"] == "body { color: red; }"
+
+
+def test_patch_holidays_with_stale_version_is_409(client, page):
+    path = f"/api/pages/{page['id']}/holidays"
+    anniversary = {"name": "Store Anniversary", "date": "2026-03-03"}
+
+    stale = client.patch(path, json={
+        "remove": [anniversary],
+        "expected_updated_at": "2000-01-01T00:00:00+00:00",
+    }, headers=auth_headers(page))
+    assert stale.status_code == 409
+    assert len(client.get(f"/api/pages/{page['id']}").json()["holidays"]) == 2
+
+    current = client.patch(path, json={
+        "remove": [anniversary],
+        "expected_updated_at": page["updated_at"],
+    }, headers=auth_headers(page))
+    assert current.status_code == 200
+    assert [h["name"] for h in current.json()["holidays"]] == ["New Year's Day"]
+
+    # The page changed, so the version the first edit used is stale now
+    again = client.patch(path, json={
+        "upsert": [{**anniversary, "status": "closed"}],
+        "expected_updated_at": page["updated_at"],
+    }, headers=auth_headers(page))
+    assert again.status_code == 409
+
+
+def test_patch_holidays_requires_owner(client, page):
+    response = client.patch(f"/api/pages/{page['id']}/holidays", json={"remove": []})
+    assert response.status_code == 401
+
+
+def test_public_page_uses_page_cache(client, page):
+    path = f"/api/pages/public/{page['business_id']}"
+    first = client.get(path)
+    assert first.status_code == 200
+    assert first.json()["business"]["name"] == "Corner Shop"
+    assert len(first.json()["page"]["holidays"]) == 2
+    assert client.get(path, headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+    hits = client.get("/metrics/cache").json()["hits"]
+    assert client.get(path).status_code == 200
+    assert client.get("/metrics/cache").json()["hits"] == hits + 1
+
+    # Editing either the page or the business changes the bundle
+    client.put(f"/api/pages/{page['id']}", json={"custom_css": "p {}"}, headers=auth_headers(page))
+    after_page = client.get(path, headers={"If-None-Match": first.headers["etag"]})
+    assert after_page.status_code == 200
+    assert after_page.json()["page"]["custom_css"] == "p {}"
+
+    client.put(f"/api/businesses/{page['business_id']}", json={"name": "Corner Shop & Cafe"},
+               headers=auth_headers(page))
+    after_business = client.get(path, headers={"If-None-Match": after_page.headers["etag"]})
+    assert after_business.status_code == 200
+    assert after_business.json()["business"]["name"] == "Corner Shop & Cafe"
+
+
+def test_public_page_records_views(client, settings, page):
+    path = f"/api/pages/public/{page['business_id']}?record_view=true&source=qr"
+    assert client.get(path).status_code == 200
+    assert client.get(path).status_code == 200
+    assert client.get(f"/api/analytics/{page['id']}").json()["views"] == 2
@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.payment import PaymentService
+
+
+@pytest.fixture
+def paystack(unit_settings, mock_paystack):
+    unit_settings.paystack_retry_backoff = 0
+    unit_settings.paystack_timeout = 0.2
+    return mock_paystack
+
+
+def verify(paystack, *references) -> list:
+    async def run():
+        service = PaymentService("sk_test", base_url=paystack.url)
+        try:
+            return [await service.verify_payment(reference) for reference in references]
+        finally:
+            await service.close()
+
+    return asyncio.run(run())
+
+
+def test_server_errors_are_retried(paystack):
+    paystack.faults = [502, 503]
+
+    assert verify(paystack, "ref_1")[0]["status"] == "success"
+    assert sum(paystack.verify_calls.values()) == 3
+
+
+def test_timeouts_are_retried(paystack):
+    paystack.faults = ["timeout"]
+
+    assert verify(paystack, "ref_1")[0]["status"] == "success"
+    assert sum(paystack.verify_calls.values()) == 2
+
+
+def test_gives_up_after_max_retries(paystack, unit_settings):
+    paystack.faults = [500] * (unit_settings.paystack_max_retries + 1)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        verify(paystack, "ref_1")
+    assert sum(paystack.verify_calls.values()) == unit_settings.paystack_max_retries + 1
+
+
+def test_gives_up_on_repeated_timeouts(paystack, unit_settings):
+    paystack.faults = ["timeout"] * (unit_settings.paystack_max_retries + 1)
+
+    with pytest.raises(httpx.TimeoutException):
+        verify(paystack, "ref_1")
+
+
+def test_client_errors_are_not_retried(paystack):
+    paystack.faults = [404]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        verify(paystack, "ref_1")
+    assert sum(paystack.verify_calls.values()) == 1
+
+
+def test_calls_reuse_one_connection(paystack):
+    paystack.faults = [503]
+
+    results = verify(paystack, "ref_1", "ref_2", "ref_3", "ref_4")
+    assert [result["reference"] for result in results] == ["ref_1", "ref_2", "ref_3", "ref_4"]
+    assert list(paystack.verify_calls.values()) == [5]
@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+
+import config
+from services.payment import PaymentService, payment_service
+from tests.conftest import wait_for_event
+
+
+def test_processed_reference_is_answered_without_paystack(client, page, mock_paystack):
+    service = PaymentService("sk_test", base_url=mock_paystack.url)
+    config.override(payment_service, service)
+    mock_paystack.transactions["ref_paid"] = {
+        "amount": 1400000,
+        "email": "owner@example.com",
+        "metadata": {"business_id": page["business_id"]},
+    }
+
+    first = client.get("/api/payment/verify/ref_paid")
+    assert first.status_code == 200, first.text
+    assert sum(mock_paystack.verify_calls.values()) == 1
+    assert wait_for_event(client, "ref_paid") == [("processed", 1)]
+
+    again = client.get("/api/payment/verify/ref_paid")
+    assert again.status_code == 200
+    assert again.json() == first.json()
+    assert sum(mock_paystack.verify_calls.values()) == 1
+    client.portal.call(service.close)
+
+
+def verify_concurrently(paystack, callers: int) -> tuple:
+    async def run():
+        service = PaymentService("sk_test", base_url=paystack.url)
+        try:
+            results = await asyncio.gather(
+                *[service.verify_payment_coalesced("ref_1") for _ in range(callers)],
+                return_exceptions=True
+            )
+            return results, dict(service._inflight)
+        finally:
+            await service.close()
+
+    return asyncio.run(run())
+
+
+def test_concurrent_verifies_share_one_call(unit_settings, mock_paystack):
+    mock_paystack.latency = 0.1
+
+    results, inflight = verify_concurrently(mock_paystack, 20)
+    assert [result["reference"] for result in results] == ["ref_1"] * 20
+    assert sum(mock_paystack.verify_calls.values()) == 1
+    assert inflight == {}
+
+
+def test_upstream_error_reaches_every_caller(unit_settings, mock_paystack):
+    unit_settings.paystack_max_retries = 0
+    mock_paystack.latency = 0.1
+    mock_paystack.faults = [500]
+
+    results, inflight = verify_concurrently(mock_paystack, 20)
+    assert all(isinstance(result, httpx.HTTPStatusError) for result in results)
+    assert sum(mock_paystack.verify_calls.values()) == 1
+    assert inflight == {}
+
+    # A later verify makes a fresh call rather than reusing the failed one
+    results, _ = verify_concurrently(mock_paystack, 1)
+    assert results[0]["status"] == "success"
+    assert sum(mock_paystack.verify_calls.values()) == 2
+
+
+def test_cancelled_caller_does_not_cancel_the_others(unit_settings, mock_paystack):
+    mock_paystack.latency = 0.2
+
+    async def run():
+        service = PaymentService("sk_test", base_url=mock_paystack.url)
+        try:
+            first = asyncio.ensure_future(service.verify_payment_coalesced("ref_1"))
+            others = [asyncio.ensure_future(service.verify_payment_coalesced("ref_1")) for _ in range(5)]
+            await asyncio.sleep(0.05)
+            first.cancel()
+            return await asyncio.gather(*others)
+        finally:
+            await service.close()
+
+    results = asyncio.run(run())
+    assert [result["reference"] for result in results] == ["ref_1"] * 5
+    assert sum(mock_paystack.verify_calls.values()) == 1
@@ -0,0 +1,105 @@
+import hashlib
+import hmac
+import json
+import time
+
+from services.email import EmailQueueFull
+from services.payment_jobs import process_event
+from tests.conftest import gather, query, wait_for_event
+
+
+def signed(settings, payload: dict) -> tuple:
+    body = json.dumps(payload).encode()
+    signature = hmac.new(settings.paystack_secret_key.encode(), body, hashlib.sha512).hexdigest()
+    return body, {"x-paystack-signature": signature, "content-type": "application/json"}
+
+
+def charge_success(reference: str, business_id: str) -> dict:
+    return {
+        "event": "charge.success",
+        "data": {
+            "reference": reference,
+            "amount": 14000,
+            "metadata": {"business_id": business_id},
+            "customer": {"email": "owner@example.com", "customer_code": "CUS_test"},
+        },
+    }
+
+
+def test_duplicate_deliveries_are_processed_once(client, settings, emails, page):
+    body, headers = signed(settings, charge_success("ref_dup", page["business_id"]))
+
+    responses = gather(client, [
+        ("POST", "/api/payment/webhook", {"content": body, "headers": headers})
+        for _ in range(5)
+    ])
+    assert [response.status_code for response in responses] == [200] * 5
+    assert client.post("/api/payment/webhook", content=body, headers=headers).status_code == 200
+
+    assert wait_for_event(client, "ref_dup") == [("processed", 1)]
+    business = query(client, "SELECT payment_status FROM businesses WHERE id = :id", id=page["business_id"])
+    assert business == [("paid",)]
+    assert emails.sent == [("owner@example.com", "receipt email")]
+
+
+def test_invalid_signature_is_rejected(client, settings, page):
+    body, headers = signed(settings, charge_success("ref_forged", page["business_id"]))
+    headers["x-paystack-signature"] = "0" * 128
+
+    response = client.post("/api/payment/webhook", content=body, headers=headers)
+    assert response.status_code == 401
+    assert query(client, "SELECT reference FROM payment_events") == []
+
+
+def test_receipt_that_cannot_be_queued_is_retried(client, settings, emails, page, monkeypatch):
+    settings.payment_job_retry_backoff = 0
+    send = emails._send
+
+    def queue_full_once(*args):
+        monkeypatch.setattr(emails, "_send", send)
+        raise EmailQueueFull("Email queue is full")
+
+    monkeypatch.setattr(emails, "_send", queue_full_once)
+    body, headers = signed(settings, charge_success("ref_full", page["business_id"]))
+    assert client.post("/api/payment/webhook", content=body, headers=headers).status_code == 200
+
+    deadline = time.monotonic() + 5
+    while query(client, "SELECT status FROM payment_events WHERE reference = 'ref_full'") != [("failed",)]:
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+    assert emails.sent == []
+
+    assert client.portal.call(process_event, "ref_full")
+    assert wait_for_event(client, "ref_full") == [("processed", 2)]
+    assert emails.sent == [("owner@example.com", "receipt email")]
+
+
+def settled(client, page, reference: str, event_status: str, attempts: int):
+    query(client, """
+        INSERT INTO payment_transactions (reference, status, amount, business_id, email)
+        VALUES (:reference, 'success', 14000, :business_id, 'owner@example.com')
+    """, reference=reference, business_id=page["business_id"])
+    query(client, """
+        INSERT INTO payment_events (reference, event, payload, status, attempts, claimed_at)
+        VALUES (:reference, 'charge.success', CAST(:payload AS jsonb), :status, :attempts, now())
+    """, reference=reference, payload=json.dumps(charge_success(reference, page["business_id"])["data"]),
+        status=event_status, attempts=attempts)
+
+
+def test_verify_leaves_unprocessed_event_to_the_job_queue(client, emails, page):
+    settled(client, page, "ref_queued", "received", 0)
+
+    response = client.get("/api/payment/verify/ref_queued")
+    assert response.status_code == 200
+    assert response.json()["status"] == "success"
+    assert wait_for_event(client, "ref_queued") == [("processed", 1)]
+    assert emails.sent == [("owner@example.com", "receipt email")]
+
+
+def test_verify_reports_event_out_of_attempts(client, settings, emails, page):
+    settled(client, page, "ref_exhausted", "failed", settings.payment_job_max_attempts)
+
+    response = client.get("/api/payment/verify/ref_exhausted")
+    assert response.status_code == 500
+    assert response.json()["detail"] == "Payment succeeded but could not be applied"
+    assert emails.sent == []
@@ -0,0 +1,72 @@
+from datetime import date, datetime
+
+from services.schedule import ScheduleCache, ScheduleIndex
+
+WEEKDAY_HOURS = {
+    day: {"open": "09:00", "close": "17:00"}
+    for day in ("monday", "tuesday", "wednesday", "thursday")
+}
+
+
+def compile(regular_hours: dict, holidays: list = ()) -> ScheduleIndex:
+    # 2026-01-01 is a Thursday
+    return ScheduleIndex.compile(regular_hours, list(holidays), date(2025, 12, 31), 21)
+
+
+def test_overnight_hours_run_past_midnight():
+    index = compile({**WEEKDAY_HOURS, "friday": {"open": "22:00", "close": "02:00"}})
+
+    assert index.is_open(datetime(2026, 1, 2, 23, 30))
+    assert index.is_open(datetime(2026, 1, 3, 1, 59))
+    assert index.next_closing(datetime(2026, 1, 3, 1, 0)) == datetime(2026, 1, 3, 2, 0)
+    assert not index.is_open(datetime(2026, 1, 3, 2, 0))
+    assert index.next_opening(datetime(2026, 1, 3, 2, 0)) == datetime(2026, 1, 5, 9, 0)
+
+
+def test_holiday_overrides_regular_hours():
+    index = compile(WEEKDAY_HOURS, [
+        {"name": "New Year's Day", "date": "2026-01-01", "status": "closed"},
+        {"name": "Stocktake", "date": "2026-01-05", "status": "special",
+         "open_time": "12:00", "close_time": "14:00"},
+    ])
+
+    assert not index.is_open(datetime(2026, 1, 1, 12, 0))
+    assert index.next_opening(datetime(2026, 1, 1, 12, 0)) == datetime(2026, 1, 5, 12, 0)
+    assert not index.is_open(datetime(2026, 1, 5, 9, 30))
+    assert index.is_open(datetime(2026, 1, 5, 13, 0))
+    assert index.next_closing(datetime(2026, 1, 5, 13, 0)) == datetime(2026, 1, 5, 14, 0)
+
+
+def test_opening_and_closing_instants():
+    index = compile(WEEKDAY_HOURS)
+
+    opens, closes = datetime(2026, 1, 5, 9, 0), datetime(2026, 1, 5, 17, 0)
+    assert index.is_open(opens)
+    assert index.next_closing(opens) == closes
+    assert not index.is_open(closes)
+    assert index.next_opening(closes) == datetime(2026, 1, 6, 9, 0)
+    assert index.next_closing(closes) == datetime(2026, 1, 6, 17, 0)
+
+
+def test_page_without_hours_is_never_open():
+    for index in (compile({}), compile(None), compile({"monday": {"open": "", "close": ""}})):
+        at = datetime(2026, 1, 5, 12, 0)
+        assert not index.is_open(at)
+        assert index.next_opening(at) is None
+        assert index.next_closing(at) is None
+
+
+def test_cache_drops_index_when_the_page_changes():
+    cache = ScheduleCache(max_entries=2, horizon_days=21)
+    at = datetime(2026, 1, 5, 12, 0)
+    payload = {"regular_hours": WEEKDAY_HOURS, "holidays": []}
+
+    index = cache.compile("page-1", ("v1",), payload, at)
+    assert cache.get("page-1", ("v1",), at) is index
+    assert cache.get("page-1", ("v2",), at) is None
+    # Past the compiled horizon the index is rebuilt
+    assert cache.get("page-1", ("v1",), datetime(2026, 1, 20, 12, 0)) is None
+
+    cache.compile("page-2", ("v1",), payload, at)
+    cache.compile("page-3", ("v1",), payload, at)
+    assert cache.get("page-1", ("v1",), at) is None
@@ -0,0 +1,124 @@
+import json
+import os
+
+import pytest
+
+from services import snapshots
+from services.snapshots import SnapshotRenderer, SnapshotStore, render_html
+from tests.conftest import auth_headers
+
+
+def bundle(payment_status: str = "pending") -> dict:
+    return {
+        "business": {
+            "id": "b1",
+            "name": "Tom & Jerry's <Deli>",
+            "email": "owner@example.com",
+            "phone": None,
+            "address": "1 Main St",
+            "payment_status": payment_status,
+        },
+        "page": {
+            "updated_at": "2026-01-02T10:00:00+00:00",
+            "holidays": [
+                {"name": "Store Anniversary", "date": "2026-03-03", "status": "special",
+                 "open_time": "10:00", "close_time": "14:00", "notes": "Cake <free>"},
+                {"name": "New Year's Day", "date": "2026-01-01", "status": "closed"},
+            ],
+        },
+    }
+
+
+def test_render_escapes_and_orders_holidays(unit_settings):
+    html = render_html(bundle())
+
+    assert "Tom &amp; Jerry&#x27;s &lt;Deli&gt;" in html
+    assert "<Deli>" not in html
+    assert "Cake &lt;free&gt;" in html
+    assert html.index("New Year&#x27;s Day") < html.index("Store Anniversary")
+    assert "Thursday, January 1, 2026" in html
+    assert "10:00 AM - 2:00 PM" in html
+    assert "1 Main St &middot; owner@example.com" in html
+    assert "Preview Mode" in html
+
+
+def test_paid_page_has_no_preview_notice(unit_settings):
+    assert "Preview Mode" not in render_html(bundle("paid"))
+
+
+def test_page_without_holidays(unit_settings):
+    page = bundle()
+    page["page"]["holidays"] = []
+    assert "No holidays configured yet." in render_html(page)
+
+
+def test_store_writes_and_deletes_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+
+    store.write("page-1", "<html>one</html>", '{"v":1}')
+    store.write("page-1", "<html>two</html>", '{"v":2}')
+    with open(store.path("page-1", "index.html"), encoding="utf-8") as f:
+        assert f.read() == "<html>two</html>"
+    with open(store.path("page-1", "page.json"), encoding="utf-8") as f:
+        assert f.read() == '{"v":2}'
+    assert sorted(os.listdir(tmp_path / "page-1")) == ["index.html", "page.json"]
+
+    store.delete("page-1")
+    assert not os.path.exists(tmp_path / "page-1")
+
+
+def test_failed_write_leaves_the_old_snapshot(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path))
+    store.write("page-1", "<html>one</html>", "{}")
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", fail)
+    with pytest.raises(OSError):
+        store.write("page-1", "<html>two</html>", "{}")
+    with open(store.path("page-1", "index.html"), encoding="utf-8") as f:
+        assert f.read() == "<html>one</html>"
+    assert sorted(os.listdir(tmp_path / "page-1")) == ["index.html", "page.json"]
+
+
+def create_page(client, name: str) -> dict:
+    business = client.post("/api/businesses", json={"name": name, "email": "owner@example.com"})
+    page = client.post("/api/pages", json={"business_id": business.json()["id"], "holidays": []})
+    assert page.status_code == 201, page.text
+    return page.json()
+
+
+def test_regenerate_writes_the_page_snapshot(client, page, tmp_path):
+    renderer = SnapshotRenderer(SnapshotStore(str(tmp_path)), enabled=True)
+
+    client.portal.call(renderer.regenerate, page["id"])
+    with open(tmp_path / page["id"] / "page.json", encoding="utf-8") as f:
+        rendered = json.load(f)
+    assert rendered["page"]["id"] == page["id"]
+    assert rendered["business"]["name"] == "Corner Shop"
+    assert [h["name"] for h in rendered["page"]["holidays"]] == ["New Year's Day", "Store Anniversary"]
+
+    client.put(f"/api/businesses/{page['business_id']}", json={"name": "Corner Store"},
+               headers=auth_headers(page))
+    client.portal.call(renderer.regenerate_business, page["business_id"])
+    with open(tmp_path / page["id"] / "index.html", encoding="utf-8") as f:
+        assert "<h1>Corner Store</h1>" in f.read()
+
+
+def test_rebuild_continues_past_a_failing_page(client, tmp_path, monkeypatch, capsys):
+    pages = [create_page(client, name) for name in ("First", "Broken", "Third")]
+    render = snapshots.render_html
+
+    def render_or_fail(bundle):
+        if bundle["business"]["name"] == "Broken":
+            raise ValueError("bad template data")
+        return render(bundle)
+
+    monkeypatch.setattr(snapshots, "render_html", render_or_fail)
+    renderer = SnapshotRenderer(SnapshotStore(str(tmp_path)), enabled=False)
+
+    assert client.portal.call(renderer.rebuild_all, 1) == 2
+    rendered = {page["id"] for page in pages if os.path.exists(tmp_path / page["id"] / "index.html")}
+    assert rendered == {pages[0]["id"], pages[2]["id"]}
+    assert "bad template data" in capsys.readouterr().out
@@ -0,0 +1,91 @@
+import pytest
+
+from services.templates import merge_holidays, split_holidays
+from tests.conftest import auth_headers, query
+
+ADMIN = {"X-Admin-Key": "test-admin-key"}
+
+TEMPLATE = [
+    {"name": "Eid al-Fitr", "date": "2026-03-20", "status": "closed"},
+    {"name": "Eid al-Fitr", "date": "2026-03-21", "status": "closed"},
+    {"name": "Christmas Day", "date": "2026-12-25", "status": "closed"},
+]
+
+
+def round_trip(holidays: list) -> list:
+    overrides, excluded = split_holidays(TEMPLATE, holidays)
+    return merge_holidays(TEMPLATE, overrides, excluded)
+
+
+def test_template_holidays_as_is_store_nothing():
+    assert split_holidays(TEMPLATE, TEMPLATE) == ([], [])
+    assert merge_holidays(TEMPLATE, [], []) == TEMPLATE
+
+
+def test_same_named_holidays_round_trip():
+    second_day = {**TEMPLATE[1], "status": "special", "open_time": "12:00", "close_time": "16:00"}
+    holidays = [TEMPLATE[0], second_day, TEMPLATE[2]]
+
+    overrides, excluded = split_holidays(TEMPLATE, holidays)
+    assert overrides == [second_day]
+    assert excluded == []
+    assert merge_holidays(TEMPLATE, overrides, excluded) == holidays
+
+
+def test_removing_one_of_two_same_named_holidays():
+    holidays = [TEMPLATE[1], TEMPLATE[2]]
+
+    overrides, excluded = split_holidays(TEMPLATE, holidays)
+    assert excluded == [{"name": "Eid al-Fitr", "date": "2026-03-20"}]
+    assert merge_holidays(TEMPLATE, overrides, excluded) == holidays
+
+
+def test_undated_override_follows_template_rollover():
+    edited = {**TEMPLATE[2], "status": "special", "open_time": "10:00", "close_time": "13:00"}
+    overrides, excluded = split_holidays(TEMPLATE, [TEMPLATE[0], TEMPLATE[1], edited])
+    assert overrides == [{key: value for key, value in edited.items() if key != "date"}]
+
+    rolled_over = [{**holiday, "date": holiday["date"].replace("2026", "2027")} for holiday in TEMPLATE]
+    merged = merge_holidays(rolled_over, overrides, excluded)
+    assert merged[2] == {**edited, "date": "2027-12-25"}
+
+
+def test_moved_holiday_replaces_the_template_one():
+    moved = {**TEMPLATE[2], "date": "2026-12-24"}
+    overrides, excluded = split_holidays(TEMPLATE, [TEMPLATE[0], TEMPLATE[1], moved])
+    assert overrides == [moved]
+    assert excluded == [{"name": "Christmas Day"}]
+    assert round_trip([TEMPLATE[0], TEMPLATE[1], moved]) == [TEMPLATE[0], TEMPLATE[1], moved]
+
+
+@pytest.fixture
+def template(client):
+    response = client.put("/api/templates/test-eid", json={
+        "name": "Eid", "country": "NG", "year": 2026, "holidays": TEMPLATE,
+    }, headers=ADMIN)
+    assert response.status_code == 200, response.text
+    yield response.json()
+    query(client, "DELETE FROM holiday_templates WHERE id = :id", id="test-eid")
+
+
+def test_template_page_keeps_same_named_holidays_apart(client, page, template):
+    expected = [{**holiday, "open_time": None, "close_time": None, "notes": None} for holiday in TEMPLATE]
+    expected[1].update(status="special", open_time="12:00", close_time="16:00")
+
+    updated = client.put(
+        f"/api/pages/{page['id']}",
+        json={"template_id": template["id"], "holidays": expected},
+        headers=auth_headers(page)
+    )
+    assert updated.status_code == 200, updated.text
+    assert updated.json()["holidays"] == expected
+    assert client.get(f"/api/pages/{page['id']}").json()["holidays"] == expected
+
+    removed = client.patch(
+        f"/api/pages/{page['id']}/holidays",
+        json={"remove": [{"name": "Eid al-Fitr", "date": "2026-03-20"}]},
+        headers=auth_headers(page)
+    )
+    assert removed.status_code == 200, removed.text
+    assert removed.json()["holidays"] == expected[1:]
+    assert removed.json()["excluded_holidays"] == [{"name": "Eid al-Fitr", "date": "2026-03-20"}]
@@ -35,7 +35,10 @@ export interface Page {
   holidays: Holiday[];
   regular_hours: RegularHours;
   custom_css?: string;
+  template_id?: string;
+  excluded_holidays?: Array<{ name: string; date?: string }>;
   updated_at: string;
+  template_updated_at?: string;
 }
 
 export interface Analytics {
@@ -50,6 +53,26 @@ export interface Analytics {
   }>;
 }
 
+export interface PageBundle {
+  business: Business;
+  page: Page;
+}
+
+export interface PatchHolidaysData {
+  upsert?: Holiday[];
+  remove?: Array<Pick<Holiday, "name" | "date">>;
+  expected_updated_at?: string;
+}
+
+export interface ScheduleStatus {
+  page_id: string;
+  timezone: string;
+  at: string;
+  is_open: boolean;
+  next_opening?: string;
+  next_closing?: string;
+}
+
 export interface CreateBusinessData {
   name: string;
   email: string;
@@ -58,10 +81,20 @@ export interface CreateBusinessData {
   type?: string;
 }
 
+export interface HolidayTemplate {
+  id: string;
+  name: string;
+  country: string;
+  year: number;
+  holidays: Holiday[];
+  updated_at: string;
+}
+
 export interface CreatePageData {
   business_id: string;
   holidays: Holiday[];
   regular_hours: RegularHours;
+  template_id?: string | null;
 }
 
 async function fetchAPI(endpoint: string, options: RequestInit = {}) {
@@ -111,8 +144,44 @@ export const api = {
         headers: { Authorization: `Bearer ${token}` },
         body: JSON.stringify(data),
       }),
+    patchHolidays: (id: string, data: PatchHolidaysData, token: string) =>
+      fetchAPI(`/api/pages/${id}/holidays`, {
+        method: "PATCH",
+        headers: { Authorization: `Bearer ${token}` },
+        body: JSON.stringify(data),
+      }),
     getByBusinessId: (businessId: string) =>
       fetchAPI(`/api/pages/business/${businessId}`),
+    getPublic: (
+      businessId: string,
+      recordView: boolean = false,
+      source: string = "direct"
+    ): Promise<PageBundle> =>
+      fetchAPI(
+        `/api/pages/public/${businessId}?record_view=${recordView}&source=${encodeURIComponent(source)}`
+      ),
+  },
+  templates: {
+    list: (country?: string): Promise<HolidayTemplate[]> =>
+      fetchAPI(
+        `/api/templates${country ? `?country=${encodeURIComponent(country)}` : ""}`
+      ),
+    get: (id: string): Promise<HolidayTemplate> =>
+      fetchAPI(`/api/templates/${id}`),
+  },
+  schedule: {
+    get: (pageId: string, tz?: string): Promise<ScheduleStatus> =>
+      fetchAPI(
+        `/api/schedule/${pageId}${tz ? `?tz=${encodeURIComponent(tz)}` : ""}`
+      ),
+    batch: (
+      pageIds: string[],
+      tz?: string
+    ): Promise<{ schedules: ScheduleStatus[]; not_found: string[] }> =>
+      fetchAPI("/api/schedule/batch", {
+        method: "POST",
+        body: JSON.stringify({ page_ids: pageIds, tz }),
+      }),
   },
   analytics: {
     get: (pageId: string) => fetchAPI(`/api/analytics/${pageId}`),
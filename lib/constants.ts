@@ -27,6 +27,10 @@ export const DAY_LABELS: Record<string, string> = {
   sunday: 'Sunday',
 };
 
+// Server-side template holding PRESET_HOLIDAYS; pages created from the wizard
+// reference it and only store the holidays they change
+export const PRESET_HOLIDAY_TEMPLATE_ID = 'us-federal';
+
 export const PRESET_HOLIDAYS = [
   { name: 'Thanksgiving Day', date: '2024-11-28' },
   { name: 'Christmas Eve', date: '2024-12-24' },
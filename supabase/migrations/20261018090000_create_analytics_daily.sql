@@ -0,0 +1,52 @@
+/*
+  # Daily analytics rollup
+
+  1. New Tables
+    - `analytics_daily`
+      - `page_id` (uuid, foreign key) - Reference to pages table
+      - `day` (date) - Day the views were recorded (UTC)
+      - `source` (text) - Traffic source
+      - `count` (integer) - Number of views for the day and source
+      - Primary key on (page_id, day, source) so views are upserted in place
+
+  2. Data
+    - Backfill from the `analytics.sources` JSONB array, then empty it.
+      `analytics.sources` is no longer written by the backend.
+
+  3. Security
+    - Enable RLS
+    - Public read access (for dashboard)
+*/
+
+CREATE TABLE IF NOT EXISTS analytics_daily (
+  page_id uuid NOT NULL REFERENCES pages(id) ON DELETE CASCADE,
+  day date NOT NULL,
+  source text NOT NULL,
+  count integer NOT NULL DEFAULT 0,
+  PRIMARY KEY (page_id, day, source)
+);
+
+-- Backfill from the legacy JSONB array
+INSERT INTO analytics_daily (page_id, day, source, count)
+SELECT
+  a.page_id,
+  (s->>'date')::date,
+  COALESCE(s->>'source', 'direct'),
+  SUM(COALESCE((s->>'count')::integer, 0))
+FROM analytics a
+CROSS JOIN LATERAL jsonb_array_elements(a.sources) AS s
+WHERE s ? 'date'
+GROUP BY 1, 2, 3
+ON CONFLICT (page_id, day, source)
+DO UPDATE SET count = analytics_daily.count + EXCLUDED.count;
+
+UPDATE analytics SET sources = '[]'::jsonb WHERE sources <> '[]'::jsonb;
+
+-- Enable Row Level Security
+ALTER TABLE analytics_daily ENABLE ROW LEVEL SECURITY;
+
+-- Allow public to read daily analytics (for dashboard)
+CREATE POLICY "Allow public to read daily analytics"
+  ON analytics_daily FOR SELECT
+  TO anon
+  USING (true);
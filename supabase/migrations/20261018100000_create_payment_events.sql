@@ -0,0 +1,34 @@
+/*
+  # Payment event idempotency table
+
+  1. New Tables
+    - `payment_events`
+      - `reference` (text, primary key) - Paystack transaction reference
+      - `event` (text) - Paystack event type (e.g. charge.success)
+      - `payload` (jsonb) - Transaction data from the webhook or verify call
+      - `status` (text) - received, processing, processed, failed
+      - `attempts` (integer) - Number of processing attempts
+      - `received_at` (timestamptz) - When the event was first recorded
+      - `claimed_at` (timestamptz) - When a worker last started processing it
+      - `processed_at` (timestamptz) - When processing finished
+
+  2. Security
+    - Enable RLS; only the backend (service role) reads or writes this table
+*/
+
+CREATE TABLE IF NOT EXISTS payment_events (
+  reference text PRIMARY KEY,
+  event text NOT NULL,
+  payload jsonb NOT NULL,
+  status text NOT NULL DEFAULT 'received' CHECK (status IN ('received', 'processing', 'processed', 'failed')),
+  attempts integer NOT NULL DEFAULT 0,
+  received_at timestamptz NOT NULL DEFAULT now(),
+  claimed_at timestamptz,
+  processed_at timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS idx_payment_events_pending
+  ON payment_events(status)
+  WHERE status <> 'processed';
+
+ALTER TABLE payment_events ENABLE ROW LEVEL SECURITY;
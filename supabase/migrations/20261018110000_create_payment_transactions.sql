@@ -0,0 +1,29 @@
+/*
+  # Settled payment transactions
+
+  1. New Tables
+    - `payment_transactions`
+      - `reference` (text, primary key) - Paystack transaction reference
+      - `status` (text) - Final Paystack status (success, failed, reversed)
+      - `amount` (integer) - Amount in kobo
+      - `business_id` (text, optional) - Business from the transaction metadata
+      - `email` (text, optional) - Customer email
+      - `verified_at` (timestamptz) - When the outcome was first verified
+
+    Settled outcomes never change, so repeated verifies of a reference are
+    answered from this table instead of calling Paystack again.
+
+  2. Security
+    - Enable RLS; only the backend (service role) reads or writes this table
+*/
+
+CREATE TABLE IF NOT EXISTS payment_transactions (
+  reference text PRIMARY KEY,
+  status text NOT NULL,
+  amount integer NOT NULL,
+  business_id text,
+  email text,
+  verified_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE payment_transactions ENABLE ROW LEVEL SECURITY;
@@ -0,0 +1,76 @@
+/*
+  # Shared holiday templates
+
+  1. New Tables
+    - `holiday_templates`
+      - `id` (text, primary key) - Stable slug, e.g. `us-federal`
+      - `name` (text) - Display name
+      - `country` (text) - Country code the template applies to
+      - `year` (integer) - Year the holiday dates belong to
+      - `holidays` (jsonb) - Holidays in the same shape as `pages.holidays`
+      - `updated_at` (timestamptz) - Last update timestamp
+
+  2. Modified Tables
+    - `pages`
+      - `template_id` (text, optional) - Template the page's holidays start from
+      - `excluded_holidays` (jsonb) - Names of template holidays the page hides
+
+    When a page has a template, `pages.holidays` only stores the holidays it
+    overrides (matched by name) or adds. Rolling a template over to a new year
+    is a single update of its row.
+
+  3. Security
+    - Enable RLS; templates are publicly readable, only the backend writes them
+
+  4. Seed Data
+    - `us-federal` with the holidays offered by the page wizard
+*/
+
+CREATE TABLE IF NOT EXISTS holiday_templates (
+  id text PRIMARY KEY,
+  name text NOT NULL,
+  country text NOT NULL,
+  year integer NOT NULL,
+  holidays jsonb NOT NULL DEFAULT '[]'::jsonb,
+  updated_at timestamptz NOT NULL DEFAULT now()
+);
+
+ALTER TABLE pages
+  ADD COLUMN IF NOT EXISTS template_id text REFERENCES holiday_templates(id) ON DELETE SET NULL,
+  ADD COLUMN IF NOT EXISTS excluded_holidays jsonb NOT NULL DEFAULT '[]'::jsonb;
+
+CREATE INDEX IF NOT EXISTS idx_pages_template_id ON pages(template_id);
+CREATE INDEX IF NOT EXISTS idx_holiday_templates_country_year ON holiday_templates(country, year);
+
+ALTER TABLE holiday_templates ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow public to read holiday templates"
+  ON holiday_templates FOR SELECT
+  TO anon
+  USING (true);
+
+CREATE TRIGGER update_holiday_templates_updated_at
+  BEFORE UPDATE ON holiday_templates
+  FOR EACH ROW
+  EXECUTE FUNCTION update_pages_timestamp();
+
+INSERT INTO holiday_templates (id, name, country, year, holidays)
+VALUES (
+  'us-federal',
+  'US Federal Holidays',
+  'US',
+  2025,
+  '[
+    {"name": "Thanksgiving Day", "date": "2024-11-28", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "Christmas Eve", "date": "2024-12-24", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "Christmas Day", "date": "2024-12-25", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "New Year''s Eve", "date": "2024-12-31", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "New Year''s Day", "date": "2025-01-01", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "Martin Luther King Jr. Day", "date": "2025-01-20", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "Presidents'' Day", "date": "2025-02-17", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "Memorial Day", "date": "2025-05-26", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "Independence Day", "date": "2025-07-04", "status": "closed", "open_time": null, "close_time": null, "notes": null},
+    {"name": "Labor Day", "date": "2025-09-01", "status": "closed", "open_time": null, "close_time": null, "notes": null}
+  ]'::jsonb
+)
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,34 @@
+/*
+  # Holiday overrides only store dates the page moved
+
+  1. Modified Data
+    - `pages.holidays`
+      - For pages with a template, overrides whose date equals the template
+        holiday's date drop their `date`, so they keep following the template
+        when it rolls over to a new year. Overrides with a different date keep
+        it: the page moved that holiday. A name the template repeats keeps
+        its date, since the name alone does not say which holiday it is.
+*/
+
+UPDATE pages p
+SET holidays = (
+  SELECT coalesce(jsonb_agg(
+    CASE
+      WHEN (
+        SELECT count(*)
+        FROM jsonb_array_elements(t.holidays) AS th
+        WHERE th->>'name' = h.elem->>'name'
+      ) = 1 AND EXISTS (
+        SELECT 1
+        FROM jsonb_array_elements(t.holidays) AS th
+        WHERE th->>'name' = h.elem->>'name'
+          AND th->>'date' = h.elem->>'date'
+      ) THEN h.elem - 'date'
+      ELSE h.elem
+    END
+    ORDER BY h.ord
+  ), '[]'::jsonb)
+  FROM jsonb_array_elements(p.holidays) WITH ORDINALITY AS h(elem, ord)
+)
+FROM holiday_templates t
+WHERE p.template_id = t.id;
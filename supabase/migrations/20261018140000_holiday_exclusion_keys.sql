@@ -0,0 +1,38 @@
+/*
+  # Template holidays are excluded by name and date
+
+  1. Modified Data
+    - `pages.excluded_holidays`
+      - Entries change from a holiday name to a `{name, date}` key, matching
+        how PATCH /holidays identifies holidays. The date is left out when the
+        name appears once in the template, so the exclusion follows that
+        holiday when the template rolls over; a name the template repeats
+        gets one entry per date.
+      - A template holiday the page moved to another date is excluded, and
+        the page's dated override becomes its own addition.
+*/
+
+UPDATE pages p
+SET excluded_holidays = (
+  SELECT coalesce(jsonb_agg(
+    CASE
+      WHEN th.same_name = 1 THEN jsonb_build_object('name', th.elem->>'name')
+      ELSE jsonb_build_object('name', th.elem->>'name', 'date', th.elem->>'date')
+    END
+    ORDER BY th.ord
+  ), '[]'::jsonb)
+  FROM (
+    SELECT e.elem, e.ord, count(*) OVER (PARTITION BY e.elem->>'name') AS same_name
+    FROM jsonb_array_elements(t.holidays) WITH ORDINALITY AS e(elem, ord)
+  ) AS th
+  WHERE p.excluded_holidays ? (th.elem->>'name')
+    OR (th.same_name = 1 AND EXISTS (
+      SELECT 1
+      FROM jsonb_array_elements(p.holidays) AS h
+      WHERE h->>'name' = th.elem->>'name'
+        AND h ? 'date'
+        AND h->>'date' <> th.elem->>'date'
+    ))
+)
+FROM holiday_templates t
+WHERE p.template_id = t.id;